@@ -0,0 +1,337 @@
+import argparse
+import csv
+import json
+import os
+import random
+
+PLAIN_MAPPING = """prefixes
+	plain = this
+	b = http://bench
+
+instances
+	b/record
+		b/id = $["id"]^^xsd:string
+		b/name = $["name"]^^xsd:string
+		b/city = $["city"]^^xsd:string
+		b/amount = $["amount"]^^xsd:real
+		b/year = $["year"]^^xsd:int
+"""
+
+CONDITIONS_MAPPING = """prefixes
+	conditions = this
+	b = http://bench
+
+instances
+	row
+		b/id = $["id"]^^xsd:string
+		b/category = $["category"]^^xsd:string
+		b/amount = $["amount"]^^xsd:real
+		class =
+			b/Gold $["category"] == "gold"
+			b/Large $["amount"] > "500"
+			b/Other
+"""
+
+LISTS_MAPPING = """prefixes
+	lists = this
+	b = http://bench
+
+instances
+	row
+		b/id = $["id"]^^xsd:string
+		class =
+			b/Sample
+
+	[items]
+		IRI = $["items"].iri
+		b/name = $["item"].name^^xsd:string
+		b/score = $["item"].score^^xsd:real
+		class =
+			b/High $["item"].score > "50"
+			b/Item
+		collection
+
+relations
+	b/items
+		subject = row
+		object = [items]
+"""
+
+REFERENCES_SOURCE_MAPPING = """prefixes
+	source = this
+	b = http://bench
+	t = http://bench/target
+
+instances
+	row
+		b/id = $["id"]^^xsd:string
+		class =
+			b/Source
+
+references
+	b/target
+		subject = row
+		condition = target.row.t/code == $["target_code"]
+"""
+
+REFERENCES_TARGET_MAPPING = """prefixes
+	target = this
+	t = http://bench/target
+
+instances
+	row
+		t/code = $["code"]^^xsd:string
+		t/label = $["label"]^^xsd:string
+		class =
+			t/Target
+"""
+
+RELATIONS_MAPPING = """prefixes
+	relations = this
+	b = http://bench
+
+instances
+	row
+		b/id = $["id"]^^xsd:string
+		b/quantity = $["quantity"]^^xsd:int
+		class =
+			b/Order
+	b/customer
+		b/name = $["customer"]^^xsd:string
+	b/product
+		b/name = $["product"]^^xsd:string
+
+relations
+	b/ordered_by
+		subject = row
+		object = b/customer
+	b/contains
+		subject = row
+		object = b/product
+"""
+
+FEATURES = ["plain", "conditions", "lists", "references", "relations"]
+CITIES = ["Paris", "Rome", "Berlin", "Madrid", "Vienna", "Lisbon", "Prague", "Dublin"]
+CATEGORIES = ["gold", "silver", "bronze", ""]
+
+def write_file(path, text):
+    """
+    Write a text file.
+
+    Args:
+        path : Path to the file.
+        text : Content of the file.
+
+    Returns:
+        None
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+def write_rows(path, header, rows):
+    """
+    Write rows to a CSV file, one at a time.
+
+    Args:
+        path : Path to the CSV file.
+        header : List of column names.
+        rows : Iterator of rows.
+
+    Returns:
+        None
+    """
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+
+def plain_rows(rows, rng):
+    """
+    Generate rows of plain instances.
+
+    Args:
+        rows : Number of rows.
+        rng : Random generator.
+
+    Returns:
+        iterator: Rows.
+    """
+    for i in range(0, rows):
+        yield ["id" + str(i), "name" + str(i), rng.choice(CITIES), round(rng.uniform(0, 1000), 2), rng.randint(1990, 2025)]
+
+def conditions_rows(rows, rng):
+    """
+    Generate rows of instances whose class depends on conditions.
+
+    Args:
+        rows : Number of rows.
+        rng : Random generator.
+
+    Returns:
+        iterator: Rows.
+    """
+    for i in range(0, rows):
+        yield ["id" + str(i), rng.choice(CATEGORIES), round(rng.uniform(0, 1000), 2)]
+
+def lists_rows(rows, rng, items):
+    """
+    Generate rows with a JSON list column, mapped to collections.
+
+    Args:
+        rows : Number of rows.
+        rng : Random generator.
+        items : Maximum number of elements of a list.
+
+    Returns:
+        iterator: Rows.
+    """
+    for i in range(0, rows):
+        elements = []
+        for _ in range(0, rng.randint(0, items)):
+            n = rng.randint(0, 999)
+            elements.append({"iri": "http://bench/item/" + str(n), "name": "item" + str(n), "score": rng.randint(0, 100)})
+        yield ["id" + str(i), json.dumps(elements)]
+
+def source_rows(rows, rng, targets):
+    """
+    Generate rows referencing the rows of the target file.
+
+    Args:
+        rows : Number of rows.
+        rng : Random generator.
+        targets : Number of rows of the target file.
+
+    Returns:
+        iterator: Rows.
+    """
+    for i in range(0, rows):
+        yield ["id" + str(i), "code" + str(rng.randrange(0, targets))]
+
+def target_rows(targets):
+    """
+    Generate the rows referenced by the source file.
+
+    Args:
+        targets : Number of rows.
+
+    Returns:
+        iterator: Rows.
+    """
+    for i in range(0, targets):
+        yield ["code" + str(i), "label" + str(i)]
+
+def relations_rows(rows, rng, customers, products):
+    """
+    Generate rows of related instances, with reused customers and products.
+
+    Args:
+        rows : Number of rows.
+        rng : Random generator.
+        customers : Number of distinct customers.
+        products : Number of distinct products.
+
+    Returns:
+        iterator: Rows.
+    """
+    for i in range(0, rows):
+        yield ["id" + str(i), rng.randint(1, 10), "customer" + str(rng.randrange(0, customers)), "product" + str(rng.randrange(0, products))]
+
+def get_files(feature, rows, directory):
+    """
+    Get the paths of the generated files of a feature.
+
+    Args:
+        feature : Mapping feature.
+        rows : Number of rows of the main input.
+        directory : Directory of the generated files.
+
+    Returns:
+        tuple: Lists of mapping files and of tabular files, in mapping order.
+    """
+    base = os.path.join(directory, feature + "_" + str(rows))
+    if feature == "references":
+        return [base + "_source.fxrml", base + "_target.fxrml"], [base + "_source.csv", base + "_target.csv"]
+    return [base + ".fxrml"], [base + ".csv"]
+
+def generate(feature, rows, directory, seed=0, items=5):
+    """
+    Generate a synthetic dataset and its mappings for one mapping feature.
+
+    Args:
+        feature : One of "plain", "conditions", "lists", "references" and "relations".
+        rows : Number of rows of the main input.
+        directory : Directory of the generated files.
+        seed : Seed of the random generator (default: 0).
+        items : Maximum number of elements of a list cell (default: 5).
+
+    Returns:
+        tuple: Lists of mapping files and of tabular files, in mapping order.
+    """
+    if feature not in FEATURES:
+        raise ValueError("Unknown feature: " + feature)
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, feature + "_" + str(rows))
+
+    if feature == "plain":
+        write_file(base + ".fxrml", PLAIN_MAPPING)
+        write_rows(base + ".csv", ["id", "name", "city", "amount", "year"], plain_rows(rows, rng))
+    elif feature == "conditions":
+        write_file(base + ".fxrml", CONDITIONS_MAPPING)
+        write_rows(base + ".csv", ["id", "category", "amount"], conditions_rows(rows, rng))
+    elif feature == "lists":
+        write_file(base + ".fxrml", LISTS_MAPPING)
+        write_rows(base + ".csv", ["id", "items"], lists_rows(rows, rng, items))
+    elif feature == "references":
+        targets = max(1, rows // 10)        # ten references per target on average
+        write_file(base + "_source.fxrml", REFERENCES_SOURCE_MAPPING)
+        write_file(base + "_target.fxrml", REFERENCES_TARGET_MAPPING)
+        write_rows(base + "_source.csv", ["id", "target_code"], source_rows(rows, rng, targets))
+        write_rows(base + "_target.csv", ["code", "label"], target_rows(targets))
+    elif feature == "relations":
+        write_file(base + ".fxrml", RELATIONS_MAPPING)
+        write_rows(base + ".csv", ["id", "quantity", "customer", "product"], relations_rows(rows, rng, max(1, rows // 100), max(1, rows // 1000)))
+
+    return get_files(feature, rows, directory)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets and mappings for FX2RML benchmarks.")
+
+    parser.add_argument(
+        "--features", 
+        nargs="+", 
+        default=FEATURES, 
+        choices=FEATURES,
+        help="Mapping features to generate"
+    )
+
+    parser.add_argument(
+        "--rows", 
+        nargs="+", 
+        type=int,
+        default=[1000], 
+        help="Numbers of rows of the main input (e.g. 1000 10000 100000)"
+    )
+
+    parser.add_argument(
+        "--directory", 
+        required=True, 
+        help="Directory of the generated files"
+    )
+
+    parser.add_argument(
+        "--seed", 
+        type=int,
+        default=0, 
+        help="Seed of the random generator"
+    )
+
+    args = parser.parse_args()
+    for feature in args.features:
+        for rows in args.rows:
+            mapping_files, tabular_files = generate(feature, rows, args.directory, args.seed)
+            print(feature, rows, " ".join(tabular_files))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core import *
+from benchmarks.generator import FEATURES, generate, get_files
+
+def reset_peak_rss():
+    """
+    Reset the peak resident set size of the process, where the system allows it (Linux).
+
+    Returns:
+        None
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+def get_peak_rss():
+    """
+    Get the peak resident set size of the process.
+
+    Returns:
+        int: Peak resident set size in bytes, since the last reset where supported.
+    """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024        # bytes on macOS, kilobytes elsewhere
+
+def measure(phases, name, function, *args):
+    """
+    Run one phase and record its wall time, CPU time and peak memory.
+
+    Args:
+        phases : Dictionary of the recorded phases.
+        name : Name of the phase.
+        function : Function running the phase.
+        args : Arguments of the function.
+
+    Returns:
+        object: Result of the function.
+    """
+    reset_peak_rss()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    result = function(*args)
+    phases[name] = {"wall": time.perf_counter() - wall, "cpu": time.process_time() - cpu, "peak_rss": get_peak_rss()}
+    return result
+
+def count_rows(tabular_files):
+    """
+    Count the data rows of CSV files.
+
+    Args:
+        tabular_files : List of tabular files.
+
+    Returns:
+        int: Number of rows, without the headers.
+    """
+    rows = 0
+    for tabular_file in tabular_files:
+        with open(tabular_file, "rb") as file:
+            rows += sum(1 for _ in file) - 1
+    return rows
+
+def parse_mappings(mapping_files, join):
+    """
+    Parse the mappings and register their references (parse phase).
+
+    Args:
+        mapping_files : List of mapping files.
+        join : Reference join.
+
+    Returns:
+        list: Parsed mappings.
+    """
+    mappings = []
+    for mapping_file in mapping_files:
+        mapping = load_mapping(mapping_file)
+        join = update_target_values(mapping[4], join)
+        mappings.append(mapping)
+    return mappings
+
+def map_sources(mappings, tabular_files, g, join, chunk_size, vectorized):
+    """
+    Map every tabular file with its mapping (map phase).
+
+    Args:
+        mappings : Parsed mappings.
+        tabular_files : List of tabular files.
+        g : RDF graph or triple sink.
+        join : Reference join.
+        chunk_size : Number of rows read and mapped at a time.
+        vectorized : Map column-wise the inputs whose mapping has no list mappings.
+
+    Returns:
+        Graph: Updated graph or triple sink.
+    """
+    for mapping, tabular_file in zip(mappings, tabular_files):
+        g, join = map_source(mapping, tabular_file, g, join, chunk_size, vectorized)
+    return g
+
+def write_output(g, output_file, output_format):
+    """
+    Serialize the graph or close the triple sink (write phase).
+
+    Args:
+        g : RDF graph or triple sink.
+        output_file : Path to the output file.
+        output_format : Format of the output file.
+
+    Returns:
+        None
+    """
+    if isinstance(g, Graph):
+        g.serialize(output_file, output_format)
+    else:
+        g.close()
+
+def run_benchmark(feature, rows, directory, output_format="nt", chunk_size=None, vectorized=False, join_memory_limit=None, seed=0):
+    """
+    Generate (once) the dataset of a feature and map it phase by phase.
+
+    Args:
+        feature : Mapping feature.
+        rows : Number of rows of the main input.
+        directory : Directory of the generated files and outputs.
+        output_format : Format of the output file (default: "nt").
+        chunk_size : Number of rows read and mapped at a time (default: None, whole file).
+        vectorized : Map column-wise the inputs whose mapping has no list mappings (default: False).
+        join_memory_limit : Number of entries kept in memory by the reference join (default: None, no spill).
+        seed : Seed of the data generator (default: 0).
+
+    Returns:
+        dict: Result of the benchmark.
+    """
+    mapping_files, tabular_files = get_files(feature, rows, directory)
+    if not all(os.path.exists(path) for path in mapping_files + tabular_files):
+        generate(feature, rows, directory, seed)
+    output_file = os.path.splitext(tabular_files[0])[0] + ".out." + output_format
+
+    phases = {}
+    join = ReferenceJoin(memory_limit=join_memory_limit)
+    g = NTriplesSink(output_file) if output_format in ("nt", "nq") else Graph()
+    mappings = measure(phases, "parse", parse_mappings, mapping_files, join)
+    g = measure(phases, "map", map_sources, mappings, tabular_files, g, join, chunk_size, vectorized)
+    g = measure(phases, "references", add_references, g, join)
+    measure(phases, "write", write_output, g, output_file, output_format)
+
+    input_rows = count_rows(tabular_files)
+    triples = len(g)
+    wall = sum(phase["wall"] for phase in phases.values())
+    return {
+        "feature": feature,
+        "rows": rows,
+        "input_rows": input_rows,
+        "options": {"output_format": output_format, "chunk_size": chunk_size, "vectorized": vectorized, "join_memory_limit": join_memory_limit},
+        "phases": phases,
+        "wall": wall,
+        "triples": triples,
+        "rows_per_second": input_rows / wall if wall > 0 else None,
+        "triples_per_second": triples / wall if wall > 0 else None,
+        "peak_rss": max(phase["peak_rss"] for phase in phases.values()),
+    }
+
+def get_environment():
+    """
+    Describe the environment of the benchmarks, to compare results between commits.
+
+    Returns:
+        dict: Commit, Python version, platform and date.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(), "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FX2RML on synthetic datasets.")
+
+    parser.add_argument(
+        "--features", 
+        nargs="+", 
+        default=FEATURES, 
+        choices=FEATURES,
+        help="Mapping features to benchmark"
+    )
+
+    parser.add_argument(
+        "--rows", 
+        nargs="+", 
+        type=int,
+        default=[1000, 10000], 
+        help="Numbers of rows of the main input (e.g. 1000 10000 100000)"
+    )
+
+    parser.add_argument(
+        "--directory", 
+        default=os.path.join(tempfile.gettempdir(), "fx2rml-benchmarks"), 
+        help="Directory of the generated datasets, reused across runs"
+    )
+
+    parser.add_argument(
+        "--results", 
+        required=True, 
+        help="Path to the JSON results file"
+    )
+
+    parser.add_argument(
+        "--format", 
+        default="nt", 
+        help="Output format (nt, nq, ttl, xml, ...)"
+    )
+
+    parser.add_argument(
+        "--chunk-size", 
+        type=int,
+        default=None, 
+        help="Read and map the inputs in chunks of this many rows"
+    )
+
+    parser.add_argument(
+        "--vectorized", 
+        action="store_true", 
+        help="Map column-wise the inputs whose mapping has no list mappings"
+    )
+
+    parser.add_argument(
+        "--join-memory-limit", 
+        type=int,
+        default=None, 
+        help="Spill the reference join to disk past this many entries"
+    )
+
+    parser.add_argument(
+        "--seed", 
+        type=int,
+        default=0, 
+        help="Seed of the data generator"
+    )
+
+    args = parser.parse_args()
+    results = {"environment": get_environment(), "results": []}
+    for feature in args.features:
+        for rows in args.rows:
+            with ProcessPoolExecutor(max_workers=1) as executor:        # fresh process: no memoized state, own peak memory
+                result = executor.submit(run_benchmark, feature, rows, args.directory, args.format, args.chunk_size, args.vectorized, args.join_memory_limit, args.seed).result()
+            results["results"].append(result)
+            print(f"{feature:>10} {rows:>9} rows  {result['wall']:8.2f} s  {result['rows_per_second']:10.0f} rows/s  {result['triples_per_second']:10.0f} triples/s  {result['peak_rss'] / 2 ** 20:8.1f} MiB")
+
+    with open(args.results, "w") as file:
+        json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 from rdflib import Graph, RDF, URIRef, Literal, BNode
-from rdflib.collection import Collection
 import pandas as pd
-import ast
-import re
 import argparse
+import re
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from structures.structures import *
 from utils.utils import *
 from parsing.parser import *
+from sinks.sinks import *
 from instantiate import *
+from vectorized import *
+from joins.joins import *
+from stats.stats import *
 import os
 
+COLUMNAR_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".feather": "arrow", ".arrow": "arrow", ".ipc": "arrow"}
+
 def json_value_of(json_data, key):
     """
     Get json value by key.
@@ -27,30 +34,24 @@ def json_value_of(json_data, key):
     else:
         return ""           
 
-def add_target_values(graph_name, instance_mapping, IRI, target_values):
+def add_target_values(graph_name, instance_mapping, IRI, join):
     """
-    Add target values to the graph mapping.
+    Add target values to the reference join.
 
     Args:
         graph_name : Name of the graph.
         instance_mapping : Instance mapping object.
         IRI : IRI of the instance.
-        target_values : Dictionary of target values.
+        join : Reference join.
 
     Returns:
-        dict: Updated target values.
+        ReferenceJoin: Updated reference join.
     """
-    if graph_name in target_values and instance_mapping.name in target_values[graph_name]:        # if the instance mapping is in the target values
-        for property, _ in target_values[graph_name][instance_mapping.name].items():
-            if property in instance_mapping.datatype_properties.keys():
-                property_value = instance_mapping.datatype_properties[property].split("^^")[0] if "^^" in instance_mapping.datatype_properties[property] else instance_mapping.datatype_properties[property] 
-                if property_value in target_values[graph_name][instance_mapping.name][property]:
-                    IRIs = target_values[graph_name][instance_mapping.name][property][property_value]
-                    IRIs.append(IRI)
-                    target_values[graph_name][instance_mapping.name][property][property_value] = IRIs
-                else:
-                    target_values[graph_name][instance_mapping.name][property][property_value] = [IRI]
-    return target_values
+    for property, key_id in join.get_targets(graph_name, instance_mapping.name).items():        # properties referenced by other mappings
+        if property in instance_mapping.datatype_properties:
+            property_value = instance_mapping.datatype_properties[property].split("^^")[0] if "^^" in instance_mapping.datatype_properties[property] else instance_mapping.datatype_properties[property]
+            join.add_target(key_id, property_value, IRI)
+    return join
 
 def add_collections(g, lists_mappings, mapped_instances):
     """
@@ -70,130 +71,154 @@ def add_collections(g, lists_mappings, mapped_instances):
             individuals = []
             head_bnode = BNode()
             for im in list_mapping.get_instance_mappings():        # for every instance mapping in the list
-                individuals.append(URIRef(mapped_instances[im.name]))
+                individuals.append(mapped_instances[im.name])
             if len(individuals) > 0:
-                Collection(g, head_bnode, individuals)
+                add_collection(g, head_bnode, individuals)
                 collections[list_mapping.name] = head_bnode
     return collections
 
-def add_instances(graph_name, g, counters, mapped_iris, mapped_instances, instances_mapping, lists_mappings, references, references_table, target_values):
+def get_list_index(lists_mappings, mapped_instances, collections):
+    """
+    Index the instances of the lists of the current row by list name.
+
+    Args:
+        lists_mappings : List of list mappings of the current row.
+        mapped_instances : Dictionary of mapped instances.
+        collections : Dictionary of collections.
+
+    Returns:
+        dict: Dictionary from list name to its collection or to its instances.
+    """
+    list_index = {}
+    for list_mapping in lists_mappings:
+        if list_mapping.name in collections:
+            list_index[list_mapping.name] = [collections[list_mapping.name]]
+        else:
+            list_index[list_mapping.name] = [mapped_instances[im.name] for im in list_mapping.get_instance_mappings()]
+    return list_index
+
+def add_collection(g, head_bnode, individuals):
+    """
+    Add an RDF collection, written as rdflib's Collection does, without querying the graph.
+
+    Args:
+        g : RDF graph or triple sink.
+        head_bnode : Blank node at the head of the collection.
+        individuals : List of members of the collection.
+
+    Returns:
+        None
+    """
+    node = head_bnode
+    for i in range(0, len(individuals)):
+        if i > 0:
+            next_node = BNode()
+            g.add((node, RDF.rest, next_node))
+            node = next_node
+        g.add((node, RDF.first, individuals[i]))
+    g.add((node, RDF.rest, RDF.nil))
+
+def add_instances(graph_name, g, counters, mapped_iris, mapped_instances, instances_mapping, lists_mappings, references, join, mint=create_IRI, repeat=False):
     """
     Add instances to the RDF graph.
 
+    A reused IRI only gets its class again if the class changed since it was
+    last added, and never gets its datatype properties again, so streamed
+    outputs have each statement once.
+
     Args:
         graph_name : Name of the graph.
         g : RDF graph.
         counters : Dictionary of counters for IRIs.
-        mapped_iris : Dictionary of mapped IRIs.
+        mapped_iris : Dictionary of mapped IRIs with their last class, by mapping name and values key.
         mapped_instances : Dictionary of mapped instances.
         instances_mapping : List of instance mappings.
         lists_mappings : List of list mappings.
         references : List of references.
-        references_table : List of references table.
-        target_values : Dictionary of target values.
+        join : Reference join.
+        mint : Function creating new IRIs from a label and the counters (default: create_IRI).
+        repeat : Add the class and datatype properties of reused IRIs too, so that every row is complete on its own (default: False).
 
     Returns:
-        tuple: Updated graph, references table, target values, counters, mapped IRIs, mapped instances, and collections.
+        tuple: Updated graph, reference join, counters, mapped IRIs, mapped instances, and lists of the row.
     """
     for instance_mapping in instances_mapping:  #for every individual that needs to be created
-        label = get_correct_label(instance_mapping)        # find the satisfied condition to determine the class
+        label = instance_mapping.label        # class of the first satisfied condition
         IRI = instance_mapping.IRI
+        reused = False
+        typed = False
         if instance_mapping.IRI is None:        # if IRI is None, create a new one
-            if instance_mapping.name not in mapped_iris:
-                if label not in counters:
-                    counters[label] = 0
-                else:
-                    counters[label] += 1
-                IRI = label + "_" + str(counters[label])        # create a new IRI
-                key = instance_mapping.get_key()        # create hash key
-                dictionary = {}        # create internal dictionary
-                dictionary[key] = IRI        # update internal dictionary
-                mapped_iris[instance_mapping.name] = dictionary            # update external dictionary
+            key = instance_mapping.get_key()        # create hash key
+            dictionary = mapped_iris.setdefault(instance_mapping.name, {})     # get internal dictionary
+            if key in dictionary:
+                IRI, emitted = dictionary[key]    #fetch existing IRI and the class it was last added with
+                reused = not repeat
+                typed = reused and emitted == label
             else:
-                dictionary = mapped_iris[instance_mapping.name]     # get internal dictionary
-                if instance_mapping.get_key() in dictionary:
-                    IRI = dictionary[instance_mapping.get_key()]    #fetch existing IRI
-                else:
-                    if label not in counters:
-                        counters[label] = 0
-                    else:
-                        counters[label] += 1
-                    IRI = label + "_" + str(counters[label])        # create a new IRI
-                    key = instance_mapping.get_key()        # create hash key
-                    dictionary[key] = IRI        # update internal dictionary
-                    mapped_iris[instance_mapping.name] = dictionary            # update external dictionary
+                IRI = mint(label, counters)        # create a new IRI
+            dictionary[key] = (IRI, label)        # update internal dictionary
             
         # add the instance to the graph
         individual = URIRef(IRI)
-        g.add((individual, RDF.type, URIRef(label)))
+        if not typed:
+            g.add((individual, RDF.type, get_IRI_term(label)))
         mapped_instances[instance_mapping.name] = individual
 
-        # add datatype properties
-        for property, value in instance_mapping.datatype_properties.items():
-            g.add((individual, URIRef(property), Literal(value)))
+        # add datatype properties (a reused IRI has the same ones already)
+        if not reused:
+            for property, value in instance_mapping.datatype_properties.items():
+                g.add((individual, get_IRI_term(property), get_literal_term(value)))
 
         # update target values
-        target_values = add_target_values(graph_name, instance_mapping, IRI, target_values)        # add the instance mapping to the target values
+        join = add_target_values(graph_name, instance_mapping, IRI, join)        # add the instance mapping to the target values
 
     collections = add_collections(g, lists_mappings, mapped_instances)        # add collections to the graph
+    list_index = get_list_index(lists_mappings, mapped_instances, collections)        # lists of this row only
 
-    # add references in table
+    # add references to the join
     for reference in references:
         if reference.column is not None:
-            subjectIRI = mapped_instances[reference.subject]
-            predicate = reference.predicate
-            column = reference.column
-            target_value = reference.target_value
-            references_table.append((subjectIRI, predicate, column, target_value))
+            join.add_reference(mapped_instances[reference.subject], reference.predicate, reference.column, reference.target_value)
 
-    return g, references_table, target_values, counters, mapped_iris, mapped_instances, collections
+    return g, join, counters, mapped_iris, mapped_instances, list_index
 
-def add_references(g, references_table, target_values):
+def add_references(g, join):
     """
     Add references to the RDF graph.
 
     Args:
         g : RDF graph.
-        references_table : List of references table.
-        target_values : Dictionary of target values.
+        join : Reference join, with all the target values and references.
 
     Returns:
         Graph: Updated RDF graph.
     """
-    for reference in references_table:
-        subjectIRI = reference[0]
-        predicate = reference[1]
-        graph = reference[2].split(".")[0]
-        instance_mapping = reference[2].split(".")[1]
-        column = reference[2].split(".")[2]
-        target_value = reference[3]
-        if graph in target_values and instance_mapping in target_values[graph] and column in target_values[graph][instance_mapping] and target_value in target_values[graph][instance_mapping][column]:
-            objectIRIs = target_values[graph][instance_mapping][column][target_value]
-            for IRI in objectIRIs:
-                g.add((subjectIRI, URIRef(predicate), URIRef(IRI)))
+    for triple in join.resolve():        # references without a target are dropped
+        g.add(triple)
+    join.close()
 
     return g
 
-def add_relations(g, mapped_instances, collections, relations_mapping):
+def add_relations(g, mapped_instances, list_index, relations_mapping):
     """
     Add relations to the RDF graph.
 
     Args:
         g : RDF graph.
         mapped_instances : Dictionary of mapped instances.
-        collections : Dictionary of collections.
+        list_index : Dictionary of the lists of the row.
         relations_mapping : List of relations mappings.
 
     Returns:
         Graph: Updated RDF graph.
     """
     for relation in relations_mapping:
-        label = get_correct_label(relation)        # find the satisfied condition to determine the label
-        for subject in get_IRI_dictionary(mapped_instances, relation.subject, collections):
-            for object in get_IRI_dictionary(mapped_instances, relation.object, collections):
-                subj_node = URIRef(subject) if not isinstance(subject, BNode) else subject
-                obj_node = URIRef(object) if not isinstance(object, BNode) else object
-                g.add((subj_node, URIRef(label), obj_node))
+        predicate = get_IRI_term(relation.label)        # predicate of the first satisfied condition
+        for subject in get_IRI_dictionary(mapped_instances, relation.subject, list_index):
+            for object in get_IRI_dictionary(mapped_instances, relation.object, list_index):
+                subj_node = subject if isinstance(subject, (URIRef, BNode)) else URIRef(subject)
+                obj_node = object if isinstance(object, (URIRef, BNode)) else URIRef(object)
+                g.add((subj_node, predicate, obj_node))
     return g
 
 #def add_list_mapping(g, counters, mapped_iris, mapped_instances, list_mappings):
@@ -203,57 +228,37 @@ def add_relations(g, mapped_instances, collections, relations_mapping):
     
 #    return g, counters, mapped_iris, mapped_instances   
 
-def get_IRI_dictionary(dict, key, collections):
+def get_IRI_dictionary(dict, key, list_index):
     """
     Get IRIs for a given key in the list of instances.
 
     Args:
         dict : Dictionary of mapped instances.
         key : Key to search in the dictionary.
-        collections : Dictionary of collections.
+        list_index : Dictionary of the lists of the row.
 
     Returns:
         list: List of IRIs or collections.
     """
-    if key in collections:
-        return [collections[key]]
-    if "_" in key:      #if it is a list mapping
-        
-        pattern = re.compile(rf'^{key}')        # regular expression to match keys starting with key_
+    if key in list_index:       # if it is a list mapping
+        return list_index[key]
+    return [dict[key]] if key in dict else []
 
-        filtered_dict = {k: v for k, v in dict.items() if pattern.match(k)}     # filter dictionary keys using the regular expression
-        return list(filtered_dict.values())
-    else:
-        return [dict[key]] if key in dict else []
-
-def update_target_values(prefixes_mappings, references_mappings, target_values):
+def update_target_values(references_mappings, join):
     """
-    Update target values from references mappings.
+    Register the target values of references mappings in the reference join.
 
     Args:
-        prefixes_mappings : Dictionary of prefixes mappings.
         references_mappings : List of references mappings.
-        target_values : Dictionary of target values.
+        join : Reference join.
 
     Returns:
-        dict: Updated target values.
+        ReferenceJoin: Updated reference join.
     """
     for reference_mapping in references_mappings:                   # for all the references
-        graph_name = reference_mapping.column.split(".")[0]
-        instance_mapping = reference_mapping.column.split(".")[1]
-        property = get_full_name(reference_mapping.column.split(".")[2], prefixes_mappings)
-        if graph_name not in target_values:         # if the graph is not present yet
-            target_values[graph_name] = {}
-        if instance_mapping not in target_values[graph_name]:           # if the instance_mapping is not present yet
-            property_dict = {}
-            property_dict[property] = {}
-            target_values[graph_name][instance_mapping] = property_dict
-        elif property not in target_values[graph_name][instance_mapping]:       # if the property is not present yet
-            property_dict = target_values[graph_name][instance_mapping]
-            property_dict[property] = {}
-            target_values[graph_name][instance_mapping] = property_dict
-
-    return target_values
+        join.register(reference_mapping.target_key)        # (graph, instance mapping, full property name)
+
+    return join
 
 def get_column_list(datatype_properties):
     """
@@ -272,66 +277,624 @@ def get_column_list(datatype_properties):
             break
     return col
 
-def safe_literal_eval(val):
+def get_list_columns(lists_mappings):
+    """
+    Get the columns containing the lists of the list mappings.
+
+    Args:
+        lists_mappings : List of list mappings.
+
+    Returns:
+        list: List of column names.
+    """
+    list_columns = []
+    for list in lists_mappings:
+        col = get_column_list(list.datatype_properties)
+        list_columns.append(col)
+    return list_columns
+
+def clean_chunk(dirty_frame, list_columns):
+    """
+    Clean and format a piece of the tabular data frame.
+
+    Text columns (all the columns of a CSV file, read as strings) only have
+    their missing values replaced, in one vectorized pass; typed columns of
+    Parquet and Arrow files are converted to text column-wise.
+
+    Args:
+        dirty_frame : Data frame as read from the tabular file.
+        list_columns : List of columns containing lists.
+
+    Returns:
+        DataFrame: Cleaned data frame.
+    """
+    typed = [col for col in dirty_frame.columns if not pd.api.types.is_string_dtype(dirty_frame[col])]
+    if len(typed) == 0:
+        return dirty_frame.fillna("")       # convert NaN to empty string
+
+    data_frame = dirty_frame.fillna({col: "" for col in dirty_frame.columns if col not in typed})
+    for col in typed:
+        if col in list_columns:         # kept as parsed, if the column holds typed lists (Python lists, see arrow_to_pandas)
+            data_frame[col] = dirty_frame[col].where(dirty_frame[col].notna(), "") if dirty_frame[col].dtype == object else ""
+        else:
+            data_frame[col] = dirty_frame[col].astype(str).where(dirty_frame[col].notna(), "")        # convert to string and replace NaN with empty string
+
+    return data_frame
+
+def get_usecols(names, columns):
+    """
+    Select the columns of a tabular file to read.
+
+    Args:
+        names : Column names of the file.
+        columns : Column names referenced by the mapping, or None for all columns.
+
+    Returns:
+        list: Column names in file order, at least one so that the rows are still counted.
+    """
+    if columns is None:
+        return list(names)
+    return [name for name in names if name in columns] or list(names)[:1]
+
+def get_mapping_columns(mapping):
+    """
+    Get the columns of the tabular data referenced by a mapping.
+
+    Args:
+        mapping : Parsed mapping (graph name, prefixes, instances, lists, references, and relations).
+
+    Returns:
+        set: Column names.
+    """
+    return get_template_columns(mapping[2], mapping[3], mapping[4], mapping[5])
+
+def arrow_to_pandas(table):
     """
-    Safely evaluate a string literal.
+    Convert an Arrow table or record batch to a data frame, with the list columns as Python lists.
 
     Args:
-        val : String value to evaluate.
+        table : Arrow table or record batch.
 
     Returns:
-        object: Evaluated value or empty list on failure.
+        DataFrame: Data frame with the typed columns of the table.
+    """
+    import pyarrow
+    data_frame = table.to_pandas()
+    for i, field in enumerate(table.schema):
+        if pyarrow.types.is_list(field.type) or pyarrow.types.is_large_list(field.type):
+            data_frame[field.name] = pd.Series(table.column(i).to_pylist(), index=data_frame.index, dtype=object)        # converted by Arrow, not cell by cell
+    return data_frame
+
+def read_columnar(tabular_file, columns=None, chunk_size=None):
+    """
+    Read a Parquet or Arrow IPC (Feather) file, only with the given columns.
+
+    Args:
+        tabular_file : Path to the tabular file.
+        columns : Column names to read, those missing from the file are skipped (default: None, all columns).
+        chunk_size : Number of rows per data frame (default: None, whole file).
+
+    Returns:
+        iterator: Data frames with the typed columns of the file, in row order.
     """
     try:
-        return ast.literal_eval(val)
-    except (ValueError, SyntaxError):
-        return []  
-    
-def clean_data_frame(tabular_file, lists_mappings):
+        import pyarrow.parquet        # optional, only loaded for Parquet and Arrow IPC inputs
+        import pyarrow.ipc
+    except ImportError:
+        raise ValueError("Parquet and Arrow inputs require the pyarrow package")
+    if COLUMNAR_FORMATS[os.path.splitext(tabular_file)[1].lower()] == "parquet":
+        parquet_file = pyarrow.parquet.ParquetFile(tabular_file)
+        names = get_usecols(parquet_file.schema_arrow.names, columns)
+        if chunk_size is None:
+            yield arrow_to_pandas(parquet_file.read(columns=names))
+        else:
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=names):        # decode one batch at a time
+                yield arrow_to_pandas(batch)
+        return
+
+    with pyarrow.memory_map(tabular_file) as source:        # Feather v2 is the Arrow IPC file format
+        table = pyarrow.ipc.open_file(source).read_all()
+        table = table.select(get_usecols(table.column_names, columns))
+        if chunk_size is None:
+            yield arrow_to_pandas(table)
+        else:
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                yield arrow_to_pandas(batch)
+
+def read_dirty_frames(tabular_file, columns=None, chunk_size=None):
+    """
+    Read the tabular data as it is in the file, whole or in chunks of rows.
+
+    CSV cells are read as strings, so values are kept as written.
+
+    Args:
+        tabular_file : Path to the tabular file (CSV, Parquet or Arrow IPC).
+        columns : Column names to read, those missing from the file are skipped (default: None, all columns).
+        chunk_size : Number of rows per chunk (default: None, whole file).
+
+    Returns:
+        iterator: Data frames, in row order.
+    """
+    if os.path.splitext(tabular_file)[1].lower() in COLUMNAR_FORMATS:
+        yield from read_columnar(tabular_file, columns, chunk_size)
+        return
+
+    usecols = get_usecols(pd.read_csv(tabular_file, sep=",", header=0, nrows=0).columns, columns)        # read the header only
+    if chunk_size is None:
+        yield pd.read_csv(tabular_file, sep=",", header=0, usecols=usecols, dtype=str)
+    else:
+        with pd.read_csv(tabular_file, sep=",", header=0, usecols=usecols, dtype=str, chunksize=chunk_size) as reader:
+            yield from reader
+
+def clean_data_frame(tabular_file, lists_mappings, columns=None):
     """
     Clean and format the tabular data frame.
 
     Args:
         tabular_file : Path to the tabular file.
         lists_mappings : List of list mappings.
+        columns : Column names to read (default: None, all columns).
 
     Returns:
         DataFrame: Cleaned data frame.
     """
-    list_columns = []
-    for list in lists_mappings:
-        col = get_column_list(list.datatype_properties)
-        list_columns.append(col)
-       
-    dirty_frame = pd.read_csv(tabular_file, sep=",", header=0)
+    dirty_frame = next(read_dirty_frames(tabular_file, columns))
+
+    return clean_chunk(dirty_frame, get_list_columns(lists_mappings))
+
+def read_data_frames(tabular_file, lists_mappings, chunk_size=None, columns=None):
+    """
+    Read the cleaned tabular data, whole or in chunks of rows.
 
-    data_frame = pd.DataFrame()  # cleaned DataFrame
+    Args:
+        tabular_file : Path to the tabular file.
+        lists_mappings : List of list mappings.
+        chunk_size : Number of rows per chunk (default: None, whole file).
+        columns : Column names to read (default: None, all columns).
 
-    for col in dirty_frame.columns:
-        if col in list_columns:
-            data_frame[col] = dirty_frame[col].astype('object').apply(lambda x: safe_literal_eval(x) if isinstance(x, str) else "")
+    Returns:
+        iterator: Cleaned data frames, in row order.
+    """
+    list_columns = get_list_columns(lists_mappings)
+    for dirty_frame in read_dirty_frames(tabular_file, columns, chunk_size):
+        yield clean_chunk(dirty_frame, list_columns)
+
+def map_data_frame(mapping, data_frame, g, counters, mapped_iris, mapped_instances, join, vectorized=False, mint=create_IRI, stats=None, profile=None):
+    """
+    Map a cleaned data frame, or a chunk of it, with its FX2RML mapping.
+
+    Args:
+        mapping : Parsed mapping (graph name, prefixes, instances, lists, references, and relations).
+        data_frame : Cleaned data frame.
+        g : RDF graph or triple sink.
+        counters : Dictionary of counters for IRIs.
+        mapped_iris : Dictionary of mapped IRIs.
+        mapped_instances : Dictionary of mapped instances.
+        join : Reference join.
+        vectorized : Map column-wise if the mapping has no list mappings (default: False).
+        mint : Function creating new IRIs from a label and the counters (default: create_IRI).
+        stats : Stats of the run (default: None, not recorded).
+        profile : Profile of the mapping elements, with the row engine (default: None, not profiled).
+
+    Returns:
+        tuple: Updated graph, reference join, counters, mapped IRIs and mapped instances.
+    """
+    graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings = mapping
+    data_frame = select_layout(data_frame, get_column_layout(instances_mappings, lists_mappings, references_mappings, relations_mappings))        # rows in the template positions
+    if stats is not None:
+        stats.count("rows", len(data_frame))
+    if profile is not None:        # one mapping element at a time
+        started = stats.start() if stats is not None else None
+        g, join, counters, mapped_iris, mapped_instances = map_rows_profiled(mapping, data_frame, g, counters, mapped_iris, mapped_instances, join, mint, profile)
+        if stats is not None:
+            stats.stop("map_profiled", started)
+    elif vectorized and len(lists_mappings) == 0:        # column-wise engine
+        started = stats.start() if stats is not None else None
+        g, join, counters, mapped_iris = map_columns(graph_name, g, data_frame, instances_mappings, references_mappings, relations_mappings, counters, mapped_iris, join, mint)
+        if stats is not None:
+            stats.stop("map_columns", started)
+            stats.count("instances", len(data_frame) * len(instances_mappings))
+    elif stats is not None:        # same loop, timing every step
+        for row in data_frame.itertuples(index=False, name=None):
+            started = stats.start()
+            instances, lists = instantiate_instances(instances_mappings, lists_mappings, row)
+            references = instantiate_references(references_mappings, row)
+            relations = instantiate_relations(relations_mappings, row)
+            stats.stop("instantiate", started)
+            started = stats.start()
+            g, join, counters, mapped_iris, mapped_instances, list_index = add_instances(graph_name, g, counters, mapped_iris, mapped_instances, instances, lists, references, join, mint)
+            stats.stop("add_instances", started)
+            started = stats.start()
+            g = add_relations(g, mapped_instances, list_index, relations)
+            stats.stop("add_relations", started)
+            stats.count("instances", len(instances))
+    else:
+        for row in data_frame.itertuples(index=False, name=None):
+            instances, lists = instantiate_instances(instances_mappings, lists_mappings, row)        # substitute the values in the mapping
+            references = instantiate_references(references_mappings, row)
+            relations = instantiate_relations(relations_mappings, row)
+               
+            # add instances
+            g, join, counters, mapped_iris, mapped_instances, list_index = add_instances(graph_name, g, counters, mapped_iris, mapped_instances, instances, lists, references, join, mint)
+            
+            #g, counters, mapped_iris, mapped_instances = add_list_mapping(g, counters, mapped_iris, mapped_instances, list_mappings)
+            
+            g = add_relations(g, mapped_instances, list_index, relations)   # add object properties        
+
+    return g, join, counters, mapped_iris, mapped_instances
+
+def map_rows_profiled(mapping, data_frame, g, counters, mapped_iris, mapped_instances, join, mint, profile):
+    """
+    Map a data frame row by row, one mapping element at a time, attributing time and triples to every element.
+
+    The triples and IRIs are the same as map_data_frame, the order of the triples of a row may differ.
+
+    Args:
+        mapping : Parsed mapping.
+        data_frame : Cleaned data frame, bound to the compiled templates.
+        g : RDF graph or triple sink.
+        counters : Dictionary of counters for IRIs.
+        mapped_iris : Dictionary of mapped IRIs.
+        mapped_instances : Dictionary of mapped instances.
+        join : Reference join.
+        mint : Function creating new IRIs from a label and the counters.
+        profile : Profile of the mapping elements.
+
+    Returns:
+        tuple: Updated graph, reference join, counters, mapped IRIs and mapped instances.
+    """
+    graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings = mapping
+    counting = CountingSink(g)
+    for row in data_frame.itertuples(index=False, name=None):
+        list_index = {}
+        for instance_mapping in instances_mappings:
+            started = profile.start()
+            instances, _ = instantiate_instances([instance_mapping], [], row)
+            instantiated = profile.start()
+            before = len(counting)
+            _, join, counters, mapped_iris, mapped_instances, _ = add_instances(graph_name, counting, counters, mapped_iris, mapped_instances, instances, [], [], join, mint)
+            profile.record("instance", graph_name + ":" + instance_mapping.name, started, instantiated, len(counting) - before)
+        for list_mapping in lists_mappings:
+            started = profile.start()
+            instances, lists = instantiate_instances([], [list_mapping], row)
+            instantiated = profile.start()
+            before = len(counting)
+            _, join, counters, mapped_iris, mapped_instances, row_lists = add_instances(graph_name, counting, counters, mapped_iris, mapped_instances, instances, lists, [], join, mint)
+            list_index.update(row_lists)
+            profile.record("list", graph_name + ":[" + list_mapping.name + "]", started, instantiated, len(counting) - before)
+        for reference_mapping in references_mappings:        # the triples are added when the references are resolved
+            started = profile.start()
+            references = instantiate_references([reference_mapping], row)
+            instantiated = profile.start()
+            _, join, counters, mapped_iris, mapped_instances, _ = add_instances(graph_name, counting, counters, mapped_iris, mapped_instances, [], [], references, join, mint)
+            profile.record("reference", reference_mapping.predicate, started, instantiated, 0)
+        for relation_mapping in relations_mappings:
+            started = profile.start()
+            relations = instantiate_relations([relation_mapping], row)
+            instantiated = profile.start()
+            before = len(counting)
+            add_relations(counting, mapped_instances, list_index, relations)
+            profile.record("relation", graph_name + ":" + relation_mapping.name, started, instantiated, len(counting) - before)
+
+    return g, join, counters, mapped_iris, mapped_instances
+
+def add_references_profiled(g, join, profile):
+    """
+    Add references to the RDF graph, attributing the time and triples of the join to every reference mapping.
+
+    Args:
+        g : RDF graph.
+        join : Reference join, with all the target values and references.
+        profile : Profile of the mapping elements.
+
+    Returns:
+        Graph: Updated RDF graph.
+    """
+    started = profile.start()
+    for triple in join.resolve():
+        g.add(triple)
+        now = profile.start()
+        profile.add_triples("reference", str(triple[1]), now - started, 1)
+        started = now
+    join.close()
+
+    return g
+
+def map_source(mapping, tabular_file, g, join, chunk_size=None, vectorized=False, stats=None, profile=None, pipeline=False):
+    """
+    Map one tabular file with its FX2RML mapping.
+
+    Args:
+        mapping : Parsed mapping (graph name, prefixes, instances, lists, references, and relations).
+        tabular_file : Path to the tabular file.
+        g : RDF graph or triple sink.
+        join : Reference join.
+        chunk_size : Number of rows read and mapped at a time (default: None, whole file).
+        vectorized : Map column-wise if the mapping has no list mappings (default: False).
+        stats : Stats of the run (default: None, not recorded).
+        profile : Profile of the mapping elements (default: None, not profiled).
+        pipeline : Read and clean the next chunks in a thread while mapping (default: False).
+
+    Returns:
+        tuple: Updated graph and reference join.
+    """
+    counters = {}       # counters for mappings with unspecified IRIs
+    mapped_instances = {}       # list of mapped instances (for instance mapping)
+    mapped_iris = {}       # list of mapped IRIs (for reusing)
+    data_frames = read_data_frames(tabular_file, mapping[3], chunk_size, get_mapping_columns(mapping))
+    if pipeline:
+        data_frames = read_ahead(data_frames)        # reader stage, at most two chunks ahead
+    if stats is not None:
+        data_frames = stats.timed(data_frames, "read")        # reading and cleaning, or waiting for the reader stage
+    for data_frame in data_frames:        # the state is carried across chunks
+        g, join, counters, mapped_iris, mapped_instances = map_data_frame(mapping, data_frame, g, counters, mapped_iris, mapped_instances, join, vectorized, stats=stats, profile=profile)
+
+    return g, join
+
+def map_source_worker(mapping, tabular_file, keys, output_format, chunk_size=None, vectorized=False):
+    """
+    Map one tabular file in a worker process.
+
+    Args:
+        mapping : Parsed mapping.
+        tabular_file : Path to the tabular file.
+        keys : Registered keys of the reference join.
+        output_format : Format of the output file.
+        chunk_size : Number of rows read and mapped at a time (default: None, whole file).
+        vectorized : Map column-wise if the mapping has no list mappings (default: False).
+
+    Returns:
+        tuple: N-Triples text or list of triples, number of triples, and target values and references of the join.
+    """
+    g = NTriplesSink() if output_format in ("nt", "nq") else TripleList()
+    g, join = map_source(mapping, tabular_file, g, ReferenceJoin(keys), chunk_size, vectorized)
+    triples = g.getvalue() if isinstance(g, NTriplesSink) else g.triples
+    return (triples, len(g)) + join.get_entries()
+
+def map_shard_worker(mapping, dirty_frame, shard_index, token, keys, output_format, vectorized=False):
+    """
+    Map a range of rows of a tabular file in a worker process, with provisional IRIs.
+
+    New IRIs are created as urn:fx2rml:<token>:<shard>:<n> and replaced by
+    reconcile_shard once all the previous ranges are known.
+
+    Args:
+        mapping : Parsed mapping.
+        dirty_frame : Range of rows as read from the tabular file.
+        shard_index : Position of the range in the file.
+        token : Token making provisional IRIs unique to the run.
+        keys : Registered keys of the reference join.
+        output_format : Format of the output file.
+        vectorized : Map column-wise if the mapping has no list mappings (default: False).
+
+    Returns:
+        tuple: N-Triples text or list of triples, number of triples, target values and references of the join, labels of the provisional IRIs, and their (mapping name, key, last label).
+    """
+    labels = []
+    def mint(label, counters):
+        labels.append(label)
+        return "urn:fx2rml:" + token + ":" + str(shard_index) + ":" + str(len(labels) - 1)
+
+    data_frame = clean_chunk(dirty_frame, get_list_columns(mapping[3]))
+    g = NTriplesSink() if output_format in ("nt", "nq") else TripleList()
+    g, join, _, mapped_iris, _ = map_data_frame(mapping, data_frame, g, {}, {}, {}, ReferenceJoin(keys), vectorized, mint)
+
+    IRI_keys = [None] * len(labels)
+    for name, dictionary in mapped_iris.items():
+        for key, (IRI, label) in dictionary.items():
+            IRI_keys[int(IRI.rsplit(":", 1)[1])] = (name, key, label)
+    triples = g.getvalue() if isinstance(g, NTriplesSink) else g.triples
+    targets, references = join.get_entries()
+    return triples, len(g), targets, references, labels, IRI_keys
+
+def reconcile_shard(labels, keys, shard_index, token, counters, mapped_iris):
+    """
+    Replace the provisional IRIs of a range of rows with the IRIs of a sequential run.
+
+    Args:
+        labels : Labels of the provisional IRIs, in creation order.
+        keys : (mapping name, key, last label) of the provisional IRIs, in creation order.
+        shard_index : Position of the range in the file.
+        token : Token making provisional IRIs unique to the run.
+        counters : Dictionary of counters for IRIs, of the previous ranges.
+        mapped_iris : Dictionary of mapped IRIs, of the previous ranges.
+
+    Returns:
+        tuple: Dictionary from provisional IRI to final IRI, and dictionary from the provisional IRIs already mapped in the previous ranges to the label they were last added with.
+    """
+    renames = {}
+    known = {}
+    prefix = "urn:fx2rml:" + token + ":" + str(shard_index) + ":"
+    for i in range(0, len(labels)):
+        name, key, label = keys[i]
+        dictionary = mapped_iris.setdefault(name, {})
+        if key not in dictionary:        # first seen in this range
+            IRI = create_IRI(labels[i], counters)
         else:
-            data_frame[col] = dirty_frame[col].apply(lambda x: str(x) if pd.notna(x) else "")        # convert to string and replace NaN with empty string
+            IRI, known[prefix + str(i)] = dictionary[key]
+        dictionary[key] = (IRI, label)
+        renames[prefix + str(i)] = IRI
+    return renames, known
 
-    return data_frame
+def drop_known(known, labels, token, triples):
+    """
+    Drop the triples of a range of rows that the previous ranges already added.
 
-def get_columns_value(row):
+    The worker of a range does not know the IRIs of the previous ranges, so it
+    adds the datatype properties and the class of the IRIs it reuses again.
+
+    Args:
+        known : Dictionary from the provisional IRIs already mapped to the label they were last added with.
+        labels : Labels of the provisional IRIs, in creation order.
+        token : Token making provisional IRIs unique to the run.
+        triples : N-Triples text or list of triples, with provisional IRIs.
+
+    Returns:
+        tuple: Remaining triples and their number.
     """
-    Get non-empty column values from a row.
+    typed = {IRI for IRI, label in known.items() if label == labels[int(IRI.rsplit(":", 1)[1])]}        # first class is the one already added
+    type_predicate = nt_term(RDF.type)
+    if isinstance(triples, str):
+        prefix = "<urn:fx2rml:" + token + ":"
+        lines = []
+        for line in triples.splitlines(keepends=True):
+            if line.startswith(prefix):
+                subject, predicate, rest = line.split(" ", 2)
+                subject = subject[1:-1]
+                if subject in known and rest.startswith("\""):        # datatype property
+                    continue
+                if subject in typed and predicate == type_predicate:
+                    typed.discard(subject)
+                    continue
+            lines.append(line)
+        return "".join(lines), len(lines)
+    kept = []
+    for triple in triples:
+        subject = str(triple[0])
+        if subject in known and isinstance(triple[2], Literal):
+            continue
+        if subject in typed and triple[1] == RDF.type:
+            typed.discard(subject)
+            continue
+        kept.append(triple)
+    return kept, len(kept)
+
+def rename_IRIs(renames, token, triples, targets, references):
+    """
+    Rename the provisional IRIs in the results of a range of rows.
 
     Args:
-        row : Row of the data frame.
+        renames : Dictionary from provisional IRI to final IRI.
+        token : Token making provisional IRIs unique to the run.
+        triples : N-Triples text or list of triples.
+        targets : Target values of the join, as (key, value, IRI).
+        references : References of the join, as (subject, predicate, key, value).
 
     Returns:
-        dict: Dictionary of column values.
+        tuple: Renamed triples, target values and references.
     """
-    columns = {}
-    for key, value in row.items():
-        if value != "":
-            columns[key] =  value
-    return columns
+    if isinstance(triples, str):
+        pattern = re.compile("<(urn:fx2rml:" + token + ":[0-9]+:[0-9]+)>")
+        triples = pattern.sub(lambda match: "<" + renames[match.group(1)] + ">", triples)
+    else:
+        triples = [tuple(URIRef(renames[str(term)]) if isinstance(term, URIRef) and str(term) in renames else term for term in triple) for triple in triples]
+    targets = [(key_id, value, renames.get(str(IRI), IRI)) for key_id, value, IRI in targets]
+    references = [(URIRef(renames.get(str(subject), str(subject))), predicate, key_id, value) for subject, predicate, key_id, value in references]
+    return triples, targets, references
 
-def fx2rml(here, mapping_files, tabular_files, output_file, output_format="ttl"):
+def map_shards(mapping, tabular_file, g, join, output_format, workers, chunk_size, vectorized=False, stats=None):
+    """
+    Map one tabular file split in ranges of rows on a process pool.
+
+    The IRIs are the same as in a sequential run: ranges are reconciled in
+    order, so counters advance and IRIs are reused as they would be row by row.
+    Only the reconciliation of the IRIs is done in order in this process; the
+    renaming of N-Triples text is sent back to the pool.
+
+    Args:
+        mapping : Parsed mapping.
+        tabular_file : Path to the tabular file.
+        g : RDF graph or triple sink.
+        join : Reference join.
+        output_format : Format of the output file.
+        workers : Number of processes.
+        chunk_size : Number of rows per range.
+        vectorized : Map column-wise if the mapping has no list mappings (default: False).
+        stats : Stats of the run (default: None, not recorded).
+
+    Returns:
+        tuple: Updated graph and reference join.
+    """
+    token = uuid.uuid4().hex
+    counters = {}
+    mapped_iris = {}
+    pending = deque()        # ranges being mapped
+    renaming = deque()        # ranges being renamed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard_index = 0
+        for dirty_frame in read_dirty_frames(tabular_file, get_mapping_columns(mapping), chunk_size):
+            pending.append((shard_index, executor.submit(map_shard_worker, mapping, dirty_frame, shard_index, token, join.get_keys(), output_format, vectorized)))
+            shard_index += 1
+            if stats is not None:
+                stats.count("rows", len(dirty_frame))
+            while len(pending) > 2 * workers or (len(pending) > 0 and pending[0][1].done()):        # bounded number of ranges in flight
+                renaming.append(reconcile_shard_result(pending.popleft(), executor, token, counters, mapped_iris))
+            while len(renaming) > 2 * workers or (len(renaming) > 0 and renaming[0].done()):
+                g, join = merge_shard(renaming.popleft(), g, join)
+        while len(pending) > 0:
+            renaming.append(reconcile_shard_result(pending.popleft(), executor, token, counters, mapped_iris))
+        while len(renaming) > 0:
+            g, join = merge_shard(renaming.popleft(), g, join)
+
+    return g, join
+
+def rename_shard_worker(renames, known, labels, token, triples, count, targets, references):
+    """
+    Drop the triples already added by the previous ranges and rename the provisional IRIs, in a worker process.
+
+    Args:
+        renames : Dictionary from provisional IRI to final IRI.
+        known : Dictionary from the provisional IRIs already mapped to the label they were last added with.
+        labels : Labels of the provisional IRIs, in creation order.
+        token : Token making provisional IRIs unique to the run.
+        triples : N-Triples text or list of triples, with provisional IRIs.
+        count : Number of triples.
+        targets : Target values of the join, as (key, value, IRI).
+        references : References of the join, as (subject, predicate, key, value).
+
+    Returns:
+        tuple: Renamed triples, their number, target values and references.
+    """
+    if len(known) > 0:
+        triples, count = drop_known(known, labels, token, triples)
+    triples, targets, references = rename_IRIs(renames, token, triples, targets, references)
+    return triples, count, targets, references
+
+def reconcile_shard_result(shard, executor, token, counters, mapped_iris):
+    """
+    Reconcile the IRIs of a mapped range of rows, in range order, and rename its results.
+
+    Args:
+        shard : Tuple of the range position and of its future.
+        executor : Process pool.
+        token : Token making provisional IRIs unique to the run.
+        counters : Dictionary of counters for IRIs.
+        mapped_iris : Dictionary of mapped IRIs.
+
+    Returns:
+        Future: Renamed results of the range (see rename_shard_worker).
+    """
+    shard_index, future = shard
+    triples, count, targets, references, labels, keys = future.result()
+    renames, known = reconcile_shard(labels, keys, shard_index, token, counters, mapped_iris)
+    if isinstance(triples, str):        # N-Triples text is cheap to send back
+        return executor.submit(rename_shard_worker, renames, known, labels, token, triples, count, targets, references)
+    future = Future()        # lists of triples cost more to send than to rename here
+    future.set_result(rename_shard_worker(renames, known, labels, token, triples, count, targets, references))
+    return future
+
+def merge_shard(future, g, join):
+    """
+    Add the renamed results of a range of rows.
+
+    Args:
+        future : Future of the renamed results of the range.
+        g : RDF graph or triple sink.
+        join : Reference join.
+
+    Returns:
+        tuple: Updated graph and reference join.
+    """
+    triples, count, targets, references = future.result()
+    if isinstance(triples, str):
+        g.add_block(triples, count)
+    else:
+        for triple in triples:
+            g.add(triple)
+    join.add_entries(targets, references)
+    return g, join
+
+def fx2rml(here, mapping_files, tabular_files, output_file, output_format="ttl", cache_dir=None, chunk_size=None, vectorized=False, workers=1, join_memory_limit=None, stats=None, profile=None, parts=None, compression=None, store=None, pipeline=False):
     """
     Execute FX2RML mappings on tabular data.
 
@@ -340,47 +903,102 @@ def fx2rml(here, mapping_files, tabular_files, output_file, output_format="ttl")
         tabular_files : List of tabular files.
         output_file : Path to the output file.
         output_format : Format of the output file (default: "ttl").
+        cache_dir : Directory of the parsed mappings cache (default: None, no disk cache).
+        chunk_size : Number of rows read and mapped at a time (default: None, whole file).
+        vectorized : Map column-wise the inputs whose mapping has no list mappings (default: False).
+        workers : Number of processes mapping the mapping/input pairs, or the ranges of rows of a single input, in parallel (default: 1).
+        join_memory_limit : Number of target values and references kept in memory before the reference join spills to disk (default: None, never).
+        stats : Stats recording the time of every phase and the counts of mapped items (default: None, not recorded).
+        profile : Profile attributing time and triples to every mapping element, mapping row by row in one process (default: None, not profiled).
+        parts : Number of N-Triples/N-Quads part files written in parallel to a directory named as the output file without extension (default: None, one file).
+        compression : Compression of the part files, "gzip" or "zstd" (default: None).
+        store : Path to a SQLite triple store receiving the triples, exported to the output file at the end (default: None, no store).
+        pipeline : Read, map and write in concurrent stages, chunk_size rows at a time (default: False).
 
     Returns:
-        Graph: RDF graph.
+        Graph: RDF graph, or the closed triple sink for N-Triples/N-Quads outputs.
     """
-    target_values = {}
-    references_table = []
+    if profile is not None:
+        workers = 1
+    if pipeline and chunk_size is None:
+        chunk_size = 10000        # the stages exchange chunks
+    join = ReferenceJoin(memory_limit=join_memory_limit)
+    started = stats.start() if stats is not None else None
 
     source_index = 0
-    g = Graph()
+    if store is not None and (parts is not None or compression is not None):
+        raise ValueError("A store cannot be combined with partitioned output")
+    if pipeline and workers > 1:
+        raise ValueError("The pipeline stages cannot be combined with worker processes")
+    if store is not None:        # deduplicated on disk
+        g = SQLiteStore(here + "/" + store)
+    elif parts is not None or compression is not None:        # part files and manifest
+        if output_format not in ("nt", "nq"):
+            raise ValueError("Partitioned output must be N-Triples (.nt) or N-Quads (.nq)")
+        g = PartitionedSink(here + "/" + os.path.splitext(output_file)[0], parts or 1, compression, output_format)
+    elif output_format in ("nt", "nq") and pipeline:
+        g = PipelinedSink(here + "/" + output_file)        # writer stage
+    elif output_format in ("nt", "nq"):
+        g = NTriplesSink(here + "/" + output_file)        # stream the triples to the output file
+    else:
+        g = Graph()
 
+    mappings = []
     for source_index in range(0, len(mapping_files)):
         mapping_file = here + "/" + mapping_files[source_index]
-        tabular_file = here + "/" + tabular_files[source_index]
-        graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings = get_mapping(mapping_file)
-        target_values = update_target_values(prefixes_mappings, references_mappings, target_values)
+        mapping = load_mapping(mapping_file, cache_dir=cache_dir)        # parsed once per run
+        graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings = mapping
+        join = update_target_values(references_mappings, join)
+        mappings.append(mapping)
+    if stats is not None:
+        stats.stop("parse", started)
+        started = stats.start()
     
-    for source_index in range(0, len(mapping_files)):
-        mapping_file = here + "/" + mapping_files[source_index]
-        tabular_file = here + "/" + tabular_files[source_index]
-
-        graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings = get_mapping(mapping_file)     
-        data_frame = clean_data_frame(tabular_file, lists_mappings)        # clean the data frame
-        counters = {}       # counters for mappings with unspecified IRIs
-        mapped_instances = {}       # list of mapped instances (for instance mapping)
-        mapped_iris = {}       # list of mapped IRIs (for reusing)
-        for _, row in data_frame.iterrows():
-            columns = get_columns_value(row)        # get the columns values
-            instances, lists = instantiate_instances(instances_mappings, lists_mappings, columns)        # substitute the values in the mapping
-            references = instantiate_references(prefixes_mappings, references_mappings, columns)
-            relations = instantiate_relations(relations_mappings, columns)  
-               
-            # add instances
-            g, references_table, target_values, counters, mapped_iris, mapped_instances, collections = add_instances(graph_name, g, counters, mapped_iris, mapped_instances, instances, lists, references, references_table, target_values)
-            
-            #g, counters, mapped_iris, mapped_instances = add_list_mapping(g, counters, mapped_iris, mapped_instances, list_mappings)
-            
-            g = add_relations(g, mapped_instances, collections, relations)   # add object properties        
-
-    g = add_references(g, references_table, target_values)   # add references
+    if workers > 1 and len(mapping_files) > 1:        # one process per mapping/input pair
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for source_index in range(0, len(mapping_files)):
+                tabular_file = here + "/" + tabular_files[source_index]
+                futures.append(executor.submit(map_source_worker, mappings[source_index], tabular_file, join.get_keys(), output_format, chunk_size, vectorized))
+            for future in futures:        # merge in input order
+                triples, count, targets, references = future.result()
+                if isinstance(triples, str):
+                    g.add_block(triples, count)
+                else:
+                    for triple in triples:
+                        g.add(triple)
+                join.add_entries(targets, references)
+    elif workers > 1:        # one large input, split in ranges of rows
+        tabular_file = here + "/" + tabular_files[0]
+        g, join = map_shards(mappings[0], tabular_file, g, join, output_format, workers, chunk_size or 10000, vectorized, stats)
+    else:
+        for source_index in range(0, len(mapping_files)):
+            tabular_file = here + "/" + tabular_files[source_index]
+            g, join = map_source(mappings[source_index], tabular_file, g, join, chunk_size, vectorized, stats, profile, pipeline)
+    if stats is not None:
+        stats.stop("map", started)        # includes the steps above, or the process pool
+        started = stats.start()
+
+    if profile is not None:
+        g = add_references_profiled(g, join, profile)
+    else:
+        g = add_references(g, join)   # add references
+    if stats is not None:
+        stats.stop("references", started)
+        stats.count("references_resolved", join.resolved)
+        stats.count("references_dropped", join.dropped)
+        started = stats.start()
     
-    g.serialize(here + "/" + output_file, output_format)
+    if isinstance(g, SQLiteStore):
+        g.export(here + "/" + output_file, output_format)
+        g.close()
+    elif isinstance(g, Graph):
+        g.serialize(here + "/" + output_file, output_format)
+    else:
+        g.close()
+    if stats is not None:
+        stats.stop("write", started)
+        stats.count("triples", len(g))
     
     return g
 
@@ -391,15 +1009,13 @@ def main():
     parser.add_argument(
         "--mappings", 
         nargs="+", 
-        required=True, 
         help="One or more FX2RML mapping (.fxrml) files"
     )
 
     parser.add_argument(
         "--inputs", 
         nargs="+", 
-        required=True, 
-        help="One or more tabular (.csv) files"
+        help="One or more tabular (.csv, .parquet, .feather or .arrow) files"
     )
 
     parser.add_argument(
@@ -408,10 +1024,148 @@ def main():
         help="Path to output file"
     )
 
+    parser.add_argument(
+        "--cache-dir", 
+        default=None, 
+        help="Directory where parsed mappings are cached across runs"
+    )
+
+    parser.add_argument(
+        "--chunk-size", 
+        type=int,
+        default=None, 
+        help="Read and map the inputs in chunks of this many rows"
+    )
+
+    parser.add_argument(
+        "--vectorized", 
+        action="store_true", 
+        help="Map column-wise the inputs whose mapping has no list mappings"
+    )
+
+    parser.add_argument(
+        "--workers", 
+        type=int,
+        default=1, 
+        help="Number of processes mapping the mapping/input pairs in parallel (ranges of rows for a single input)"
+    )
+
+    parser.add_argument(
+        "--join-memory-limit", 
+        type=int,
+        default=None, 
+        help="Spill the reference join to a temporary SQLite file past this many target values and references"
+    )
+
+    parser.add_argument(
+        "--incremental", 
+        default=None, 
+        metavar="MANIFEST",
+        help="Map only the rows added or changed since the run that wrote this manifest file"
+    )
+
+    parser.add_argument(
+        "--delta", 
+        action="store_true", 
+        help="With --incremental, also write the added and removed triples to <output>.added.nt and <output>.removed.nt"
+    )
+
+    parser.add_argument(
+        "--stats", 
+        nargs="?", 
+        const="-",
+        default=None, 
+        metavar="FILE",
+        help="Record the time of every phase and the counts of mapped items; print a summary, or write JSON to FILE"
+    )
+
+    parser.add_argument(
+        "--profile", 
+        nargs="?", 
+        const="-",
+        default=None, 
+        metavar="FILE",
+        help="Attribute time and triples to every instance, list, reference and relation mapping (row by row, one process); print the top elements, or write JSON to FILE"
+    )
+
+    parser.add_argument(
+        "--parts", 
+        type=int,
+        default=None, 
+        help="Write the .nt/.nq output as this many part files, in parallel, to a directory named as the output without extension"
+    )
+
+    parser.add_argument(
+        "--compression", 
+        choices=["gzip", "zstd"],
+        default=None, 
+        help="Compress the part files (zstd requires the zstandard package)"
+    )
+
+    parser.add_argument(
+        "--pipeline", 
+        action="store_true", 
+        help="Read, map and write in concurrent stages connected by bounded queues (--chunk-size rows at a time, 10000 by default)"
+    )
+
+    parser.add_argument(
+        "--store", 
+        default=None, 
+        help="SQLite file receiving the triples, deduplicated on disk and exported to --output at the end; running again adds only the missing triples"
+    )
+
+    parser.add_argument(
+        "--export-store", 
+        action="store_true", 
+        help="Only export the triples of --store to --output (e.g. after a crashed run)"
+    )
+
     args = parser.parse_args()
     output_format = args.output.split(".")[-1] 
-    
-    g = fx2rml(here, args.mappings, args.inputs, args.output, output_format)     # Call FX2RML function with parsed arguments
+    if args.export_store:
+        if args.store is None:
+            parser.error("--export-store requires --store")
+        if not os.path.isfile(here + "/" + args.store):        # sqlite3 would create an empty store
+            parser.error("--store " + args.store + " does not exist")
+        store = SQLiteStore(here + "/" + args.store, record_run=False)
+        store.export(here + "/" + args.output, output_format)
+        store.close()
+        return
+    if args.mappings is None or args.inputs is None:
+        parser.error("the following arguments are required: --mappings, --inputs")
+    if args.incremental is not None:
+        for option, value in (("--workers", args.workers != 1), ("--vectorized", args.vectorized), ("--parts", args.parts is not None), ("--compression", args.compression is not None), ("--store", args.store is not None), ("--pipeline", args.pipeline), ("--profile", args.profile is not None)):
+            if value:
+                parser.error(option + " cannot be combined with --incremental")
+    elif args.delta:
+        parser.error("--delta requires --incremental")
+    if args.pipeline and args.workers > 1:        # the stages run in one process
+        parser.error("--pipeline cannot be combined with --workers")
+    if args.parts is not None or args.compression is not None:
+        if args.store is not None:
+            parser.error("--store cannot be combined with --parts or --compression")
+        if output_format not in ("nt", "nq"):
+            parser.error("--parts and --compression require a .nt or .nq --output")
+        if args.parts is not None and args.parts < 1:
+            parser.error("--parts must be at least 1")
+        if args.compression == "zstd" and zstandard is None:
+            parser.error("--compression zstd requires the zstandard package")
+
+    stats = Stats() if args.stats is not None else None
+    profile = Profile() if args.profile is not None else None
+    if args.incremental is not None:
+        from incremental.incremental import fx2rml_incremental        # imports this module
+        g = fx2rml_incremental(here, args.mappings, args.inputs, args.output, args.incremental, output_format, args.cache_dir, args.chunk_size, args.delta, args.join_memory_limit, stats)
+    else:
+        g = fx2rml(here, args.mappings, args.inputs, args.output, output_format, args.cache_dir, args.chunk_size, args.vectorized, args.workers, args.join_memory_limit, stats, profile, args.parts, args.compression, args.store, args.pipeline)     # Call FX2RML function with parsed arguments
+    if args.stats == "-":
+        print(stats.summary())
+    elif stats is not None:
+        stats.write(here + "/" + args.stats)
+    if args.profile == "-":
+        print(profile.report())
+    elif profile is not None:
+        profile.write(here + "/" + args.profile)
     #print_graph(g)
 
 """
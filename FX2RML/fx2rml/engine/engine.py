@@ -0,0 +1,61 @@
+from core import *
+
+class Engine:
+    """Map data frames or rows with parsed FX2RML mappings, batch after batch, in process."""
+
+    def __init__(self, mappings, vectorized=False, join_memory_limit=None):
+        self.mappings = list(mappings)
+        self.vectorized = vectorized
+        self.join_memory_limit = join_memory_limit
+        self.columns = [get_mapping_columns(mapping) for mapping in self.mappings]
+        self.list_columns = [get_list_columns(mapping[3]) for mapping in self.mappings]
+        self.reset()
+
+    @classmethod
+    def from_files(cls, mapping_files, cache_dir=None, vectorized=False, join_memory_limit=None):
+        return cls([load_mapping(mapping_file, cache_dir=cache_dir) for mapping_file in mapping_files], vectorized, join_memory_limit)
+
+    def reset(self):
+        self.join = ReferenceJoin(memory_limit=self.join_memory_limit)
+        for mapping in self.mappings:
+            self.join = update_target_values(mapping[4], self.join)
+        self.states = [({}, {}, {}) for _ in self.mappings]        # counters, mapped IRIs and mapped instances of every mapping
+
+    def map(self, data, source=0, g=None, columns=None):
+        """
+        Map a batch of tabular data; counters, reused IRIs and references are carried across batches.
+
+        Args:
+            data : Data frame, or iterable of rows (dictionaries, or sequences ordered as columns).
+            source : Position of the mapping of the data (default: 0).
+            g : RDF graph or triple sink receiving the triples (default: None, triples are returned).
+            columns : Column names of sequence rows (default: None).
+
+        Returns:
+            Graph: The given graph, or an iterator over the triples of the batch.
+        """
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame.from_records(list(data), columns=columns)
+        data_frame = clean_chunk(data[get_usecols(data.columns, self.columns[source])], self.list_columns[source])        # only the referenced columns
+        sink = TripleList() if g is None else g
+        counters, mapped_iris, mapped_instances = self.states[source]
+        sink, self.join, counters, mapped_iris, mapped_instances = map_data_frame(self.mappings[source], data_frame, sink, counters, mapped_iris, mapped_instances, self.join, self.vectorized)
+        self.states[source] = (counters, mapped_iris, mapped_instances)
+        return iter(sink.triples) if g is None else g
+
+    def finish(self, g=None):
+        """
+        Resolve the references of all the mapped batches and start over with an empty state.
+
+        Args:
+            g : RDF graph or triple sink receiving the triples (default: None, triples are returned).
+
+        Returns:
+            Graph: The given graph, or an iterator over the reference triples.
+        """
+        sink = add_references(TripleList() if g is None else g, self.join)
+        self.reset()
+        return iter(sink.triples) if g is None else g
+
+    def close(self):
+        self.join.close()
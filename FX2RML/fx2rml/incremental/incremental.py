@@ -0,0 +1,277 @@
+from core import *
+import hashlib
+import os
+import pickle
+import sqlite3
+
+MANIFEST_VERSION = "5"          # bump when the row records change
+
+def get_row_key(row):
+    """
+    Get a fixed-width key for the content of a row.
+
+    Args:
+        row : Tuple of cleaned row values.
+
+    Returns:
+        bytes: 128-bit key, stable across runs.
+    """
+    text = "\x1f".join(map(str, row))
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+def map_rows(mapping, data_frame, positions, counters, mapped_iris, keys):
+    """
+    Map some rows of a data frame one at a time, recording what each row produces.
+
+    Reused IRIs get their class and datatype properties again, so that every
+    record is complete on its own.
+
+    Args:
+        mapping : Parsed mapping.
+        data_frame : Cleaned data frame.
+        positions : Positions of the rows to map, in row order.
+        counters : Dictionary of counters for IRIs.
+        mapped_iris : Dictionary of mapped IRIs.
+        keys : Registered keys of the reference join.
+
+    Returns:
+        list: Records of the rows, as (lines, target values, references).
+    """
+    graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings = mapping
+    layout = get_column_layout(instances_mappings, lists_mappings, references_mappings, relations_mappings)
+    recorder = RowRecorder()
+    records = []
+    for row in select_layout(data_frame.iloc[positions], layout).itertuples(index=False, name=None):
+        join = ReferenceJoin(keys)
+        instances, lists = instantiate_instances(instances_mappings, lists_mappings, row)
+        references = instantiate_references(references_mappings, row)
+        relations = instantiate_relations(relations_mappings, row)
+        _, join, counters, mapped_iris, mapped_instances, list_index = add_instances(graph_name, recorder, counters, mapped_iris, {}, instances, lists, references, join, repeat=True)
+        add_relations(recorder, mapped_instances, list_index, relations)
+        records.append((recorder.take(),) + join.get_entries())
+    return records
+
+class Manifest:
+    """
+    Record of an incremental run in a SQLite file.
+
+    The rows table keeps, for every row, the hash of its content and the
+    pickled lines, target values and references it produced, tagged with the
+    run that last saw it. The counters and mapped IRIs of every source are
+    kept in the sources table and loaded in memory. Everything is written in
+    one transaction, committed once the output is written.
+    """
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.connection = self.open(signature)
+
+    def open(self, signature):
+        connection = sqlite3.connect(self.path)
+        try:
+            tables = [name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            if len(tables) > 0 and "meta" not in tables:
+                raise sqlite3.DatabaseError("no manifest tables")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            meta = dict(connection.execute("SELECT name, value FROM meta"))
+            if meta.get("version") != MANIFEST_VERSION or meta.get("mappings") != signature:        # first run, or the mappings changed
+                connection.execute("DROP TABLE IF EXISTS sources")
+                connection.execute("DROP TABLE IF EXISTS rows")
+                connection.execute("DELETE FROM meta")
+                connection.executemany("INSERT INTO meta VALUES (?, ?)", [("version", MANIFEST_VERSION), ("mappings", signature), ("run", "0")])
+            connection.execute("CREATE TABLE IF NOT EXISTS sources (source INTEGER PRIMARY KEY, state BLOB)")
+            connection.execute("CREATE TABLE IF NOT EXISTS rows (source INTEGER, key BLOB, run INTEGER, seq INTEGER, record BLOB)")
+            connection.execute("CREATE INDEX IF NOT EXISTS rows_key ON rows (source, run, key)")
+            self.run = int(connection.execute("SELECT value FROM meta WHERE name = 'run'").fetchone()[0])
+        except sqlite3.DatabaseError as error:        # e.g. a CSV or output file given by mistake, left as it is
+            connection.close()
+            raise ValueError(self.path + " is not an incremental manifest (" + str(error) + ")")
+        return connection
+
+    def get_state(self, source):
+        row = self.connection.execute("SELECT state FROM sources WHERE source = ?", (source,)).fetchone()
+        return pickle.loads(row[0]) if row is not None else {"counters": {}, "mapped_iris": {}, "columns": None}
+
+    def set_state(self, source, state):
+        self.connection.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (source, pickle.dumps(state, pickle.HIGHEST_PROTOCOL)))
+
+    def keep(self, source, key, seq):
+        """Move one record of the previous run with this row hash to the new run, and tell whether there was one."""
+        cursor = self.connection.execute("UPDATE rows SET run = ?, seq = ? WHERE rowid = (SELECT rowid FROM rows WHERE source = ? AND run = ? AND key = ? LIMIT 1)", (self.run + 1, seq, source, self.run, key))
+        return cursor.rowcount > 0
+
+    def add(self, source, rows):
+        self.connection.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?)", [(source, key, self.run + 1, seq, pickle.dumps(record, pickle.HIGHEST_PROTOCOL)) for key, seq, record in rows])
+
+    def records(self, run):
+        for (record,) in self.connection.execute("SELECT record FROM rows WHERE run = ? ORDER BY source, seq", (run,)):
+            yield pickle.loads(record)
+
+    def count(self, run):
+        return self.connection.execute("SELECT COUNT(*) FROM rows WHERE run = ?", (run,)).fetchone()[0]
+
+    def commit(self):
+        self.connection.execute("DELETE FROM rows WHERE run = ?", (self.run,))        # removed rows
+        self.connection.execute("UPDATE meta SET value = ? WHERE name = 'run'", (str(self.run + 1),))
+        self.connection.commit()
+        self.run += 1
+
+    def close(self):
+        self.connection.close()
+
+def map_source_incremental(mapping, tabular_file, manifest, source, keys, chunk_size=None, stats=None):
+    """
+    Map one tabular file against the records of the previous run, mapping only the added or changed rows.
+
+    Args:
+        mapping : Parsed mapping.
+        tabular_file : Path to the tabular file.
+        manifest : Manifest of the previous run.
+        source : Position of the mapping/input pair.
+        keys : Registered keys of the reference join.
+        chunk_size : Number of rows read and mapped at a time (default: None, whole file).
+        stats : Stats of the run (default: None, not recorded).
+
+    Returns:
+        None
+    """
+    state = manifest.get_state(source)
+    seq = 0
+    for data_frame in read_data_frames(tabular_file, mapping[3], chunk_size, get_mapping_columns(mapping)):
+        columns = list(data_frame.columns)
+        compare = columns == state["columns"]        # otherwise the rows cannot be compared
+        row_keys = [get_row_key(row) for row in data_frame.itertuples(index=False, name=None)]
+        positions = []
+        for position in range(0, len(row_keys)):
+            if not (compare and manifest.keep(source, row_keys[position], seq + position)):        # unchanged rows keep their record
+                positions.append(position)
+        records = map_rows(mapping, data_frame, positions, state["counters"], state["mapped_iris"], keys)
+        manifest.add(source, [(row_keys[position], seq + position, record) for position, record in zip(positions, records)])
+        state["columns"] = columns
+        seq += len(row_keys)
+        if stats is not None:
+            stats.count("rows", len(row_keys))
+            stats.count("rows_mapped", len(positions))
+    manifest.set_state(source, state)
+
+def get_output_lines(records, keys, join_memory_limit=None):
+    """
+    Get the distinct N-Triples lines of the recorded rows, with their resolved references.
+
+    Args:
+        records : Records of the rows, as (lines, target values, references).
+        keys : Registered keys of the reference join.
+        join_memory_limit : Number of entries kept in memory by the reference join (default: None, no spill).
+
+    Returns:
+        list: N-Triples lines.
+    """
+    seen = set()
+    lines = []
+    join = ReferenceJoin(keys, join_memory_limit)
+    for record_lines, targets, references in records:
+        for line in record_lines:
+            if line not in seen:
+                seen.add(line)
+                lines.append(line)
+        join.add_entries(targets, references)
+    for s, p, o in join.resolve():
+        line = nt_term(s) + " " + nt_term(p) + " " + nt_term(o) + " .\n"
+        if line not in seen:
+            seen.add(line)
+            lines.append(line)
+    join.close()
+    return lines
+
+def write_lines(path, lines):
+    """
+    Write N-Triples lines to a file.
+
+    Args:
+        path : Path to the file.
+        lines : N-Triples lines.
+
+    Returns:
+        None
+    """
+    sink = NTriplesSink(path)
+    sink.add_block("".join(lines), len(lines))
+    sink.close()
+
+def fx2rml_incremental(here, mapping_files, tabular_files, output_file, manifest_file, output_format="ttl", cache_dir=None, chunk_size=None, delta=False, join_memory_limit=None, stats=None):
+    """
+    Execute FX2RML mappings on tabular data, mapping only the rows added or changed since the previous run.
+
+    The manifest keeps the records of the rows on disk (see Manifest), so that
+    unchanged rows keep their IRIs and new IRIs never clash with them. A new
+    manifest is started when the mappings change. The distinct output lines
+    are still collected in memory to remove the duplicates.
+
+    Args:
+        mapping_files : List of mapping files.
+        tabular_files : List of tabular files.
+        output_file : Path to the output file.
+        manifest_file : Path to the manifest file.
+        output_format : Format of the output file (default: "ttl").
+        cache_dir : Directory of the parsed mappings cache (default: None, no disk cache).
+        chunk_size : Number of rows read at a time (default: None, whole file).
+        delta : Also write the added and removed triples next to the output file (default: False).
+        join_memory_limit : Number of target values and references kept in memory before the reference join spills to disk (default: None, never).
+        stats : Stats recording the time of every phase and the counts of mapped items (default: None, not recorded).
+
+    Returns:
+        Graph: RDF graph, or None for N-Triples/N-Quads outputs.
+    """
+    join = ReferenceJoin()
+    started = stats.start() if stats is not None else None
+    mappings = []
+    signature = []
+    for source_index in range(0, len(mapping_files)):
+        mapping_file = here + "/" + mapping_files[source_index]
+        mapping = load_mapping(mapping_file, cache_dir=cache_dir)
+        join = update_target_values(mapping[4], join)
+        mappings.append(mapping)
+        with open(mapping_file, "rb") as file:
+            signature.append(hashlib.sha256(file.read()).hexdigest())
+
+    manifest = Manifest(here + "/" + manifest_file, " ".join(signature))
+    try:
+        old_lines = get_output_lines(manifest.records(manifest.run), join.get_keys(), join_memory_limit) if delta else None
+        if stats is not None:
+            stats.stop("parse", started)        # mappings and manifest
+            started = stats.start()
+
+        for source_index in range(0, len(mapping_files)):
+            tabular_file = here + "/" + tabular_files[source_index]
+            map_source_incremental(mappings[source_index], tabular_file, manifest, source_index, join.get_keys(), chunk_size, stats)
+        if stats is not None:
+            stats.count("rows_removed", manifest.count(manifest.run))
+            stats.stop("map", started)
+            started = stats.start()
+
+        lines = get_output_lines(manifest.records(manifest.run + 1), join.get_keys(), join_memory_limit)
+        if stats is not None:
+            stats.stop("references", started)        # with the lines of all the rows
+            started = stats.start()
+        g = None
+        if output_format in ("nt", "nq"):
+            write_lines(here + "/" + output_file, lines)
+        else:
+            g = Graph()
+            g.parse(data="".join(lines), format="nt")
+            g.serialize(here + "/" + output_file, output_format)
+
+        if delta:
+            old_set = set(old_lines)
+            new_set = set(lines)
+            base = here + "/" + os.path.splitext(output_file)[0]
+            write_lines(base + ".added.nt", [line for line in lines if line not in old_set])
+            write_lines(base + ".removed.nt", [line for line in old_lines if line not in new_set])
+
+        manifest.commit()        # the previous run stays recorded if anything failed
+    finally:
+        manifest.close()
+    if stats is not None:
+        stats.stop("write", started)
+        stats.count("triples", len(lines))
+    return g
@@ -1,190 +1,256 @@
 from structures.structures import *
 from utils.utils import *
 
-def instantiate_value(mapping, row_data):
+def get_templates(instances_mappings, lists_mappings, references_mappings, relations_mappings):
     """
-    Instantiate a value from a mapping and row data.
+    Get the compiled templates reading the cells of a row.
 
     Args:
-        mapping : Mapping string containing column references.
-        row_data : Dictionary of row data.
+        instances_mappings : List of instance mappings.
+        lists_mappings : List of list mappings.
+        references_mappings : List of reference mappings.
+        relations_mappings : List of relation mappings.
 
     Returns:
-        str: Instantiated value or None if the column is not found.
+        list: Compiled templates (None where a value is not a column).
     """
-    col = mapping.split("$[")[1].split("]")[0].replace("\"", "") 
-    if col not in row_data:
-        return None  
-    if row_data[col].endswith(".0"):
-        row_data[col] = row_data[col].split(".0")[0]
-    mapping = str(row_data[col]) + mapping.split("]")[1]
-    
-    return mapping
+    templates = []
+    for instance_mapping in instances_mappings:
+        templates.append(instance_mapping.IRI_template)
+        templates.extend(instance_mapping.templates.values())
+        templates.extend(condition.template for condition in instance_mapping.compiled_conditions)
+    for list_mapping in lists_mappings:
+        templates.append(list_mapping.list_template)
+    for reference_mapping in references_mappings:
+        templates.append(reference_mapping.target_template)
+    for relation_mapping in relations_mappings:
+        templates.extend(condition.template for condition in relation_mapping.compiled_conditions)
+    return templates
 
-def instantiate_list(list_mapping, row_data):
+def get_template_columns(instances_mappings, lists_mappings, references_mappings, relations_mappings):
     """
-    Instantiate a list from a list mapping and row data.
+    Get the columns read by the compiled templates.
+
+    Args:
+        instances_mappings : List of instance mappings.
+        lists_mappings : List of list mappings.
+        references_mappings : List of reference mappings.
+        relations_mappings : List of relation mappings.
+
+    Returns:
+        set: Column names.
+    """
+    return {template.column for template in get_templates(instances_mappings, lists_mappings, references_mappings, relations_mappings) if template is not None}
+
+def get_column_layout(instances_mappings, lists_mappings, references_mappings, relations_mappings):
+    """
+    Get the column layout of a mapping, the columns read by its templates in a fixed order.
+
+    Args:
+        instances_mappings : List of instance mappings.
+        lists_mappings : List of list mappings.
+        references_mappings : List of reference mappings.
+        relations_mappings : List of relation mappings.
+
+    Returns:
+        list: Column names, sorted.
+    """
+    return sorted(get_template_columns(instances_mappings, lists_mappings, references_mappings, relations_mappings))
+
+def index_templates(instances_mappings, lists_mappings, references_mappings, relations_mappings):
+    """
+    Set the position of the column of every compiled template in the column layout, once after compiling.
+
+    Args:
+        instances_mappings : List of instance mappings.
+        lists_mappings : List of list mappings.
+        references_mappings : List of reference mappings.
+        relations_mappings : List of relation mappings.
+
+    Returns:
+        None
+    """
+    layout = get_column_layout(instances_mappings, lists_mappings, references_mappings, relations_mappings)
+    for template in get_templates(instances_mappings, lists_mappings, references_mappings, relations_mappings):
+        if template is not None:
+            template.index = layout.index(template.column)
+
+def select_layout(data_frame, layout):
+    """
+    Select the columns of a column layout in a data frame, so that its rows match the template positions.
+
+    The templates are only read, so the same compiled mapping can map several
+    data frames at the same time.
+
+    Args:
+        data_frame : Cleaned data frame.
+        layout : Column layout of the mapping.
+
+    Returns:
+        DataFrame: Data frame with the layout columns, empty cells for the missing ones.
+    """
+    return data_frame.reindex(columns=layout, fill_value="")
+
+def instantiate_value(template, row):
+    """
+    Instantiate a value from a compiled template and a row.
+
+    Args:
+        template : Compiled value template.
+        row : Tuple of cleaned row values, in the column layout of the mapping.
+
+    Returns:
+        str: Instantiated value or None if the cell is empty or the column is not found.
+    """
+    value = row[template.index]
+    if value == "":
+        return None
+    if value.endswith(".0"):
+        value = value.split(".0")[0]
+    return value + template.suffix
+
+def instantiate_list(list_mapping, row):
+    """
+    Instantiate a list from a list mapping and a row, parsing the cell if it is text.
 
     Args:
         list_mapping : List mapping object.
-        row_data : Dictionary of row data.
+        row : Tuple of cleaned row values.
 
     Returns:
         list: Instantiated list.
     """
-    col = ""
-    for _, value in list_mapping.datatype_properties.items():
-        col = value.split("$[")[1].split("]")[0].replace("\"", "")
-        break
-    return row_data[col]
+    template = list_mapping.list_template
+    if template is None:
+        return []
+    value = row[template.index]
+    return parse_list(value) if isinstance(value, str) else value        # typed list columns are already parsed
 
-def instantiate_subvalue(field, json_data):
+def instantiate_subvalue(template, json_data):
     """
-    Instantiate a subvalue from a field and JSON data.
+    Instantiate a subvalue from a compiled template and JSON data.
 
     Args:
-        field : Field string containing subfield references.
+        template : Compiled nested value template.
         json_data : JSON data dictionary.
 
     Returns:
         str: Instantiated subvalue or None if the subfield is not found.
     """
-    if "^^" not in field:
-        subfield = field.split("].")[1] 
-        if subfield not in json_data:
-            return None
-        return str(json_data[subfield])
-    
-    subfield = field.split("].")[1].split("^^")[0]
-    value_type = field.split("^^")[1]
-
-    if subfield not in json_data:
+    if template.subfield not in json_data:
         return None
-    
-    return str(json_data[subfield]) + "^^" + value_type
+    return str(json_data[template.subfield]) + template.suffix
+
+def instantiate_label(compiled_conditions, row, json_data=None):
+    """
+    Find the label of the first satisfied condition, instantiating only the values it needs.
+
+    Args:
+        compiled_conditions : List of compiled conditions.
+        row : Tuple of cleaned row values.
+        json_data : JSON element, for the conditions of list mappings (default: None).
+
+    Returns:
+        str: Label of the first satisfied condition ("" if none is satisfied).
+    """
+    for condition in compiled_conditions:
+        if condition.template is None:
+            value = ""
+        elif json_data is not None:
+            value = instantiate_subvalue(condition.template, json_data)
+        else:
+            value = instantiate_value(condition.template, row)
+        if condition_holds(value, condition.operator, condition.literal, condition.number):
+            return condition.label
+    return ""
 
-def instantiate_instances(instances_mapping, lists_mappings, row_data):
+def instantiate_instances(instances_mapping, lists_mappings, row):
     """
-    Instantiate instances and lists from mappings and row data.
+    Instantiate instances and lists from mappings and a row.
 
     Args:
         instances_mapping : List of instance mappings.
         lists_mappings : List of list mappings.
-        row_data : Dictionary of row data.
+        row : Tuple of cleaned row values.
 
     Returns:
-        tuple: List of instantiated instances and lists.
+        tuple: List of instance bindings and list bindings of the row.
     """
     instances = []
     lists = []
     for instance_mapping in instances_mapping:                          # simple instances
-        if instance_mapping.IRI is not None and "$" in instance_mapping.IRI:        # if IRI is specified as a column
-            IRI = instantiate_value(instance_mapping.IRI, row_data)        # instantiate the IRI
-        else:  
+        if instance_mapping.IRI_template is not None:        # if IRI is specified as a column
+            IRI = instantiate_value(instance_mapping.IRI_template, row)        # instantiate the IRI
+        else:
             IRI = None
-        im = InstanceMapping(instance_mapping.name, IRI)        # create instance mapping with substitutions
-        for property, value in instance_mapping.datatype_properties.items():
-            if value is not None and "$" in value:                # if the value is specified as a column
-                cell_value = instantiate_value(value, row_data)
+        datatype_properties = {}
+        for property, template in instance_mapping.templates.items():
+            if template is not None:                # if the value is specified as a column
+                cell_value = instantiate_value(template, row)
                 if cell_value is not None:
-                    im.datatype_properties[property] = cell_value         # instantiate the value
+                    datatype_properties[property] = cell_value         # instantiate the value
             else:
-                im.datatype_properties[property] = instance_mapping.datatype_properties[property]        # keep the original value
-        conditions = []         #new conditions
-        for condition in instance_mapping.conditions:
-            if value is not None and "$" in condition[0]:                # if the column is specified as a column
-                conditions.append((instantiate_value(condition[0], row_data), condition[1], condition[2], condition[3]))        # instantiate the value for triggering the condition
-            else:
-                conditions.append(condition)            # keep the original condition
-        im.set_conditions(conditions)        # update the conditions
-        instances.append(im)        # add the instance mapping to the list
+                datatype_properties[property] = instance_mapping.datatype_properties[property]        # keep the original value
+        label = instantiate_label(instance_mapping.compiled_conditions, row)        # choose the class with the values of the row
+        instances.append(InstanceBinding(instance_mapping, instance_mapping.name, IRI, datatype_properties, label))        # only the values of the row, the mapping is shared
 
-    for list_mapping in lists_mappings:        # list instances   
-        lm = ListMapping(list_mapping.name + "_", list_mapping.IRI, list_mapping.is_collection)        # create list mapping with substitutions
-        json_data = instantiate_list(list_mapping, row_data)        # instantiate the list
+    for list_mapping in lists_mappings:        # list instances
+        lm = ListBinding(list_mapping)
+        json_data = instantiate_list(list_mapping, row)        # instantiate the list
         for i in range(0, len(json_data)):
-            if list_mapping.IRI is not None and "$" in list_mapping.IRI:        # if IRI is specified as a column
-                local_IRI = instantiate_subvalue(lm.IRI, json_data[i])
-                IRI = local_IRI
+            if list_mapping.IRI_template is not None:        # if IRI is specified as a column
+                IRI = instantiate_subvalue(list_mapping.IRI_template, json_data[i])
             else:
                 IRI = None
-            im = InstanceMapping(lm.name + str(i), IRI)
-            for property, value in list_mapping.datatype_properties.items():
-                if property != "IRI" and property != "collection":        # if it is not the IRI or collection property
-                    if value is not None and "$" in value:                # if the value is specified as a column
-                        cell_value = instantiate_subvalue(value, json_data[i])
-                        if cell_value is not None:
-                            im.datatype_properties[property] = cell_value         # instantiate the value
-                    else:
-                        im.datatype_properties[property] = instance_mapping.datatype_properties[property]        # keep the original value
-            conditions = []         #new conditions
-            for condition in list_mapping.conditions:
-                if value is not None and "$" in condition[0]:                # if the column is specified as a column
-                    conditions.append((instantiate_subvalue(condition[0], json_data[i]), condition[1], condition[2], condition[3]))        # instantiate the value for triggering the condition
+            datatype_properties = {}
+            for property, template in list_mapping.templates.items():
+                if template is not None:                # if the value is specified as a column
+                    cell_value = instantiate_subvalue(template, json_data[i])
+                    if cell_value is not None:
+                        datatype_properties[property] = cell_value         # instantiate the value
                 else:
-                    conditions.append(condition)            # keep the original condition
-            im.set_conditions(conditions)       # non parametric for lists
-            lm.add_instance_mapping(im)        # add the instance mapping to the list
-            instances.append(im)        # add the instance mapping to the list
-        
-        lists.append(lm)        # add the instance mapping to the list
-    
+                    datatype_properties[property] = list_mapping.datatype_properties[property]        # keep the original value
+            label = instantiate_label(list_mapping.compiled_conditions, row, json_data[i])        # choose the class with the values of the element
+            im = InstanceBinding(list_mapping, lm.name + str(i), IRI, datatype_properties, label)
+            lm.add_instance_mapping(im)        # add the instance to the list
+            instances.append(im)        # add the instance to the list
+
+        lists.append(lm)        # add the list to the lists of the row
+
     return instances, lists
 
-def instantiate_references(prefixes_mappings, references_mappings, row_data):
+def instantiate_references(references_mappings, row):
     """
-    Instantiate references from mappings and row data.
+    Instantiate references from mappings and a row.
 
     Args:
-        prefixes_mappings : Dictionary of prefix mappings.
         references_mappings : List of reference mappings.
-        row_data : Dictionary of row data.
+        row : Tuple of cleaned row values.
 
     Returns:
-        list: List of instantiated references.
+        list: List of reference bindings of the row.
     """
     references = []
     for reference_mapping in references_mappings:        # for every reference mapping
-        target_value = instantiate_value(reference_mapping.target_value, row_data)
+        target_value = instantiate_value(reference_mapping.target_template, row) if reference_mapping.target_template is not None else None
         if target_value is not None:        # if the value is specified as a column
-            rm = ReferenceMapping(reference_mapping.predicate)        # create reference mapping with substitutions
-            rm.set_subject(reference_mapping.subject)
-            full_property = reference_mapping.column.split(".")[0] + "." + reference_mapping.column.split(".")[1] + "." + get_full_name(reference_mapping.column.split(".")[2], prefixes_mappings)
-            rm.set_column(full_property)
-            rm.set_target_value(target_value)
-            references.append(rm)        # add the instance mapping to the list
+            references.append(ReferenceBinding(reference_mapping, target_value))
 
     return references
 
-def instantiate_relations(relations_mappings, row_data):
+def instantiate_relations(relations_mappings, row):
     """
-    Instantiate relations from mappings and row data.
+    Instantiate relations from mappings and a row.
 
     Args:
         relations_mappings : List of relation mappings.
-        row_data : Dictionary of row data.
+        row : Tuple of cleaned row values.
 
     Returns:
-        list: List of instantiated relations.
+        list: List of relation bindings of the row.
     """
     relations = []
-    for relation_mapping in relations_mappings:     
-        predicate = None                    
-        rm = RelationMapping(relation_mapping.name)        # create relation mapping with substitutions
-        if relation_mapping.predicate is None:        # if predicate is not specified
-            conditions = []         #new conditions
-            for condition in relation_mapping.conditions:
-                if "$" in condition[0]:                # if the column is specified as a column
-                    conditions.append((instantiate_value(condition[0], row_data), condition[1], condition[2], condition[3]))        # instantiate the value for triggering the condition
-                else:
-                    conditions.append(condition)            # keep the original condition
-        else:
-            predicate = relation_mapping.predicate
-            conditions = relation_mapping.conditions
-        rm.set_predicate(predicate)        # update the predicate
-        rm.set_subject(relation_mapping.subject)
-        rm.set_object(relation_mapping.object)
-        rm.set_conditions(conditions)        # update the conditions
-        relations.append(rm)        # add the instance mapping to the list
-    
-    return relations
\ No newline at end of file
+    for relation_mapping in relations_mappings:
+        relations.append(RelationBinding(relation_mapping, instantiate_label(relation_mapping.compiled_conditions, row)))        # choose the predicate with the values of the row
+
+    return relations
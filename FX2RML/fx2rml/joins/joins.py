@@ -0,0 +1,151 @@
+from rdflib import URIRef
+import os
+import shutil
+import sqlite3
+import tempfile
+
+class ReferenceJoin:
+    """
+    Hash join between the references of the rows (probe side) and the values
+    of the referenced instances (build side).
+
+    Keys (graph, instance mapping, property) and predicates are interned to
+    integers. Once more than memory_limit entries are held, both sides are
+    spilled to a SQLite file and the join is computed by SQLite.
+    """
+
+    def __init__(self, keys=None, memory_limit=None, directory=None, batch_size=100000):
+        self.keys = dict(keys) if keys is not None else {}        # (graph, instance mapping, property) -> id
+        self.targets_by_instance = {}
+        for key, key_id in self.keys.items():
+            self.targets_by_instance.setdefault((key[0], key[1]), {})[key[2]] = key_id
+        self.predicates = {}
+        self.memory_limit = memory_limit
+        self.directory = directory
+        self.batch_size = batch_size
+        self.build = {}         # id -> value -> list of IRIs
+        self.probe = []         # (subject, predicate id, key id, value)
+        self.entries = 0
+        self.connection = None
+        self.spill_directory = None
+        self.build_buffer = []
+        self.probe_buffer = []
+        self.build_sequence = 0
+        self.probe_sequence = 0
+        self.resolved = 0
+        self.dropped = 0
+
+    def register(self, key):
+        if key not in self.keys:
+            self.keys[key] = len(self.keys)
+            self.targets_by_instance.setdefault((key[0], key[1]), {})[key[2]] = self.keys[key]
+        return self.keys[key]
+
+    def get_keys(self):
+        return self.keys
+
+    def get_targets(self, graph_name, instance_mapping):
+        return self.targets_by_instance.get((graph_name, instance_mapping), {})
+
+    def add_target(self, key_id, value, IRI):
+        if self.connection is not None:
+            self.build_buffer.append((key_id, value, str(IRI), self.build_sequence))
+            self.build_sequence += 1
+            if len(self.build_buffer) >= self.batch_size:
+                self.flush()
+            return
+        self.build.setdefault(key_id, {}).setdefault(value, []).append(IRI)
+        self.entries += 1
+        if self.memory_limit is not None and self.entries > self.memory_limit:
+            self.spill()
+
+    def add_reference(self, subject, predicate, key, value):
+        key_id = self.keys.get(key)
+        if key_id is None:          # not a registered target
+            self.dropped += 1
+            return
+        if predicate not in self.predicates:
+            self.predicates[predicate] = len(self.predicates)
+        if self.connection is not None:
+            self.probe_buffer.append((str(subject), self.predicates[predicate], key_id, value, self.probe_sequence))
+            self.probe_sequence += 1
+            if len(self.probe_buffer) >= self.batch_size:
+                self.flush()
+            return
+        self.probe.append((subject, self.predicates[predicate], key_id, value))
+        self.entries += 1
+        if self.memory_limit is not None and self.entries > self.memory_limit:
+            self.spill()
+
+    def get_entries(self):
+        """Return the in-memory build and probe entries, e.g. to send them back from a worker process."""
+        predicates = {predicate_id: predicate for predicate, predicate_id in self.predicates.items()}
+        targets = [(key_id, value, IRI) for key_id, values in self.build.items() for value, IRIs in values.items() for IRI in IRIs]
+        references = [(subject, predicates[predicate_id], key_id, value) for subject, predicate_id, key_id, value in self.probe]
+        return targets, references
+
+    def add_entries(self, targets, references):
+        """Add build and probe entries returned by get_entries, with the same keys."""
+        for key_id, value, IRI in targets:
+            self.add_target(key_id, value, IRI)
+        keys = {key_id: key for key, key_id in self.keys.items()}
+        for subject, predicate, key_id, value in references:
+            self.add_reference(subject, predicate, keys[key_id], value)
+
+    def spill(self):
+        self.spill_directory = tempfile.mkdtemp(prefix="fx2rml-join-", dir=self.directory)
+        self.connection = sqlite3.connect(os.path.join(self.spill_directory, "join.sqlite"))
+        self.connection.execute("PRAGMA journal_mode=OFF")
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.execute("CREATE TABLE build (key INTEGER, value TEXT, iri TEXT, seq INTEGER)")
+        self.connection.execute("CREATE TABLE probe (subject TEXT, predicate INTEGER, key INTEGER, value TEXT, seq INTEGER)")
+        for key_id, values in self.build.items():
+            for value, IRIs in values.items():
+                for IRI in IRIs:
+                    self.build_buffer.append((key_id, value, str(IRI), self.build_sequence))
+                    self.build_sequence += 1
+        for subject, predicate_id, key_id, value in self.probe:
+            self.probe_buffer.append((str(subject), predicate_id, key_id, value, self.probe_sequence))
+            self.probe_sequence += 1
+        self.build = {}
+        self.probe = []
+        self.entries = 0
+        self.flush()
+
+    def flush(self):
+        if self.build_buffer:
+            self.connection.executemany("INSERT INTO build VALUES (?, ?, ?, ?)", self.build_buffer)
+            self.build_buffer = []
+        if self.probe_buffer:
+            self.connection.executemany("INSERT INTO probe VALUES (?, ?, ?, ?, ?)", self.probe_buffer)
+            self.probe_buffer = []
+        self.connection.commit()
+
+    def resolve(self):
+        """Yield the (subject, predicate, object) triples of the references, in reference order."""
+        predicates = {predicate_id: URIRef(predicate) for predicate, predicate_id in self.predicates.items()}
+        if self.connection is None:
+            for subject, predicate_id, key_id, value in self.probe:
+                IRIs = self.build.get(key_id, {}).get(value)
+                if IRIs is None:
+                    self.dropped += 1
+                    continue
+                self.resolved += 1
+                for IRI in IRIs:
+                    yield (subject, predicates[predicate_id], URIRef(IRI))
+            return
+
+        self.flush()
+        self.connection.execute("CREATE INDEX build_index ON build (key, value, seq)")       # indexed build side
+        matched = self.connection.execute("SELECT COUNT(*) FROM probe p WHERE EXISTS (SELECT 1 FROM build b WHERE b.key = p.key AND b.value = p.value)").fetchone()[0]
+        self.resolved += matched
+        self.dropped += self.probe_sequence - matched        # the unregistered references are already counted
+        rows = self.connection.execute("SELECT p.subject, p.predicate, b.iri FROM probe p JOIN build b ON b.key = p.key AND b.value = p.value ORDER BY p.seq, b.seq")
+        for subject, predicate_id, IRI in rows:
+            yield (URIRef(subject), predicates[predicate_id], URIRef(IRI))
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            shutil.rmtree(self.spill_directory, ignore_errors=True)
@@ -1,5 +1,12 @@
 from structures.structures import *
 from utils.utils import *
+from instantiate import index_templates
+import hashlib
+import pickle
+import os
+
+CACHE_VERSION = "6"         # bump when the parsed structures change
+mappings_memo = {}          # parsed mappings of the current run, by content hash
 
 def count_tabs(line):
     """
@@ -320,6 +327,90 @@ def get_fx2rml_relations(prefixes_mappings, instances_mappings, lists_mappings,
 
     return relation_mappings
 
+def compile_template(value, nested=False):
+    """
+    Compile a column template into a value template.
+
+    Args:
+        value : Template string, e.g. $["column"]^^xsd:string or $["column"].field^^xsd:string.
+        nested : Whether the template addresses a field of a JSON element (default is False).
+
+    Returns:
+        ValueTemplate: Compiled template or None if the value does not reference a column.
+    """
+    if value is None or "$" not in value:
+        return None
+    column = value.split("$[")[1].split("]")[0].replace("\"", "")
+    if not nested:              # atomic value: cell + suffix
+        return ValueTemplate(column, value.split("]")[1])
+    if "^^" not in value:       # nested value without datatype
+        return ValueTemplate(column, "", value.split("].")[1])
+    return ValueTemplate(column, "^^" + value.split("^^")[1], value.split("].")[1].split("^^")[0])
+
+def compile_conditions(conditions, nested=False):
+    """
+    Compile the conditions of a mapping.
+
+    Args:
+        conditions : List of conditions as tuples.
+        nested : Whether the conditions address fields of JSON elements (default is False).
+
+    Returns:
+        list: List of Condition objects.
+    """
+    compiled_conditions = []
+    for condition in conditions:
+        template = compile_template(condition[0], nested) if "$" in condition[0] else None
+        number = to_number(condition[2]) if condition[1] in ORDERINGS else None        # compare numerically if both sides are numbers
+        compiled_conditions.append(Condition(template, condition[1], condition[2], condition[3], number))
+
+    return compiled_conditions
+
+def compile_mappings(prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings):
+    """
+    Compile the templates of the mappings once, so that rows only need lookups.
+
+    Args:
+        prefixes_mappings : Dictionary of prefix mappings.
+        instances_mappings : List of instance mappings.
+        lists_mappings : List of list mappings.
+        references_mappings : List of reference mappings.
+        relations_mappings : List of relation mappings.
+
+    Returns:
+        None
+    """
+    for instance_mapping in instances_mappings:
+        IRI_template = compile_template(instance_mapping.IRI)        # None if the IRI has to be created
+        templates = {}
+        for property, value in instance_mapping.datatype_properties.items():
+            templates[property] = compile_template(value)        # None for constant values
+        instance_mapping.set_templates(IRI_template, templates, compile_conditions(instance_mapping.conditions))
+
+    for list_mapping in lists_mappings:
+        list_template = None
+        templates = {}
+        for property, value in list_mapping.datatype_properties.items():
+            if list_template is None and "$" in value:        # the first column is the list column
+                list_template = compile_template(value)
+            if property != "IRI" and property != "collection":
+                templates[property] = compile_template(value, True)
+        IRI_template = compile_template(list_mapping.IRI, True)
+        list_mapping.set_templates(list_template, IRI_template, templates, compile_conditions(list_mapping.conditions, True))
+
+    for reference_mapping in references_mappings:
+        column = reference_mapping.column.split(".")
+        target_key = (column[0], column[1], get_full_name(column[2], prefixes_mappings))        # split once, the full name may contain dots
+        reference_mapping.set_templates(compile_template(reference_mapping.target_value), target_key)
+
+    for relation_mapping in relations_mappings:
+        if relation_mapping.predicate is None:        # predicate chosen by conditions
+            relation_mapping.set_compiled_conditions(compile_conditions(relation_mapping.conditions))
+        else:
+            relation_mapping.set_compiled_conditions(compile_conditions([("", c[1], c[2], c[3]) for c in relation_mapping.conditions]))
+
+    index_templates(instances_mappings, lists_mappings, references_mappings, relations_mappings)        # positions in the column layout, never changed afterwards
+
 def get_mapping(mapping_file, separator="="):
     """
     Parse an FX2RML mapping file and extract its components.
@@ -345,5 +436,47 @@ def get_mapping(mapping_file, separator="="):
             references_mappings = get_fx2rml_references(prefixes_mappings, node["children"], separator)
         elif node["line"] == "relations":
             relations_mappings = get_fx2rml_relations(prefixes_mappings, instances_mappings, lists_mappings, node["children"])
+    compile_mappings(prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings)        # compile the templates once
     
-    return graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings
\ No newline at end of file
+    return graph_name, prefixes_mappings, instances_mappings, lists_mappings, references_mappings, relations_mappings
+
+def load_mapping(mapping_file, separator="=", cache_dir=None):
+    """
+    Get the parsed mapping of an FX2RML file, parsing it at most once per run.
+
+    The mapping is memoized in process and, if a cache directory is given,
+    pickled on disk under the hash of the file content.
+
+    Args:
+        mapping_file : Path to the FX2RML mapping file.
+        separator : Separator used in the file (default is "=").
+        cache_dir : Directory of the on-disk cache (default is None, no disk cache).
+
+    Returns:
+        tuple: Graph name, prefixes, instances, lists, references, and relations.
+    """
+    with open(mapping_file, 'rb') as file:
+        content = file.read()
+    key = hashlib.sha256(CACHE_VERSION.encode() + separator.encode() + content).hexdigest()        # key on the content, not on the path
+    if key in mappings_memo:
+        return mappings_memo[key]
+
+    mapping = None
+    cache_file = os.path.join(cache_dir, key + ".pickle") if cache_dir is not None else None
+    if cache_file is not None and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as file:
+                mapping = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            mapping = None          # unreadable entry, parse again
+    if mapping is None:
+        mapping = get_mapping(mapping_file, separator)
+        if cache_file is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary_file = cache_file + "." + str(os.getpid()) + ".tmp"
+            with open(temporary_file, 'wb') as file:
+                pickle.dump(mapping, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file, cache_file)        # atomic for concurrent jobs
+
+    mappings_memo[key] = mapping
+    return mapping
\ No newline at end of file
@@ -0,0 +1,175 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core import *
+from engine.engine import Engine
+
+MEDIA_TYPES = {"nt": "application/n-triples", "nq": "application/n-quads", "ttl": "text/turtle", "xml": "application/rdf+xml", "json-ld": "application/ld+json"}
+
+class MappingHandler(BaseHTTPRequestHandler):
+    """Map the CSV body of a POST /<mapping> request and send the RDF back."""
+
+    protocol_version = "HTTP/1.1"       # keep-alive and chunked responses
+
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, text):
+        data = text.encode("utf-8")
+        if len(data) > 0:
+            self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path != "/":
+            self.send_error(404, "Not found")
+            return
+        self.send_json(200, {"mappings": sorted(self.server.mappings)})
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        name = urllib.parse.unquote(url.path.strip("/"))
+        output_format = urllib.parse.parse_qs(url.query).get("format", ["nt"])[0]
+        if name not in self.server.mappings:
+            self.send_error(404, "Unknown mapping: " + name)
+            return
+        if output_format not in MEDIA_TYPES:
+            self.send_error(400, "Unknown format: " + output_format)
+            return
+        if self.headers.get("Content-Length") is None:
+            self.send_error(411, "The CSV body needs a Content-Length")
+            return
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+
+        engine = Engine([self.server.mappings[name]], self.server.vectorized, self.server.join_memory_limit)        # fresh state for every request
+        try:
+            batches = pd.read_csv(io.BytesIO(body), sep=",", header=0, dtype=str, chunksize=self.server.chunk_size)
+            batch = next(batches, None)        # errors in the header are reported before the response starts
+        except ValueError as error:
+            engine.close()
+            self.send_error(400, "Invalid CSV: " + str(error))
+            return
+
+        try:
+            if output_format in ("nt", "nq"):        # streamed, one batch at a time
+                self.send_response(200)
+                self.send_header("Content-Type", MEDIA_TYPES[output_format])
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                while batch is not None:
+                    g = NTriplesSink()
+                    engine.map(batch, 0, g)
+                    self.send_chunk(g.getvalue())
+                    batch = next(batches, None)
+                g = NTriplesSink()
+                engine.finish(g)
+                self.send_chunk(g.getvalue())
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                g = Graph()
+                while batch is not None:
+                    engine.map(batch, 0, g)
+                    batch = next(batches, None)
+                engine.finish(g)
+                self.send_response(200)
+                self.send_header("Content-Type", MEDIA_TYPES[output_format])
+                data = g.serialize(format=output_format, encoding="utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+        except ValueError as error:        # the response has started, drop the connection
+            self.log_error("Mapping failed: %s", str(error))
+            self.close_connection = True
+        finally:
+            engine.close()
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server on a Unix socket, one thread per connection."""
+
+    daemon_threads = True
+
+def create_server(mappings, host="127.0.0.1", port=8000, socket_path=None, chunk_size=10000, vectorized=False, join_memory_limit=None):
+    """
+    Create a mapping server, on a TCP port or on a Unix socket.
+
+    Args:
+        mappings : Dictionary of parsed mappings, by name.
+        host : Host to listen on (default: 127.0.0.1).
+        port : Port to listen on (default: 8000).
+        socket_path : Path of a Unix socket, used instead of the host and port (default: None).
+        chunk_size : Number of rows of the request mapped at a time (default: 10000).
+        vectorized : Map column-wise if the mapping has no list mappings (default: False).
+        join_memory_limit : Number of join entries kept in memory before spilling to disk (default: None, no limit).
+
+    Returns:
+        Server: HTTP server, not started.
+    """
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)        # left by a previous server
+        server = UnixHTTPServer(socket_path, MappingHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), MappingHandler)
+    server.mappings = mappings
+    server.chunk_size = chunk_size
+    server.vectorized = vectorized
+    server.join_memory_limit = join_memory_limit
+    return server
+
+def load_mappings(mapping_files, cache_dir=None):
+    """
+    Parse the mappings served, named after their files.
+
+    Args:
+        mapping_files : List of paths to FX2RML mapping files.
+        cache_dir : Directory of the parsed mappings cache (default: None, no disk cache).
+
+    Returns:
+        dict: Parsed mappings, by file name without extension.
+    """
+    mappings = {}
+    for mapping_file in mapping_files:
+        name = os.path.splitext(os.path.basename(mapping_file))[0]
+        if name in mappings:
+            raise ValueError("Two mappings are named " + name)
+        mappings[name] = load_mapping(mapping_file, cache_dir=cache_dir)
+    return mappings
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve FX2RML mappings over HTTP: POST CSV to /<mapping>, get RDF back.")
+    parser.add_argument("--mappings", nargs="+", required=True, help="One or more FX2RML mapping (.fxrml) files, served as /<file name without extension>")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--cache-dir", help="Directory caching the parsed mappings across runs")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Number of rows of a request mapped at a time (default: 10000)")
+    parser.add_argument("--vectorized", action="store_true", help="Map column-wise the mappings without list mappings")
+    parser.add_argument("--join-memory-limit", type=int, help="Number of join entries kept in memory before spilling to disk")
+    args = parser.parse_args()
+
+    here = os.getcwd()
+    mappings = load_mappings([here + "/" + mapping_file for mapping_file in args.mappings], args.cache_dir)
+    server = create_server(mappings, args.host, args.port, args.socket, args.chunk_size, args.vectorized, args.join_memory_limit)
+    print("Serving " + ", ".join(sorted(mappings)) + " on " + (args.socket or args.host + ":" + str(args.port)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket is not None and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+if __name__ == "__main__":
+    main()
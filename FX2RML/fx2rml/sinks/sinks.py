@@ -0,0 +1,382 @@
+from rdflib import Literal
+from abc import ABC, abstractmethod
+import gzip
+import io
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+try:
+    import zstandard        # optional, for zstd compressed parts
+except ImportError:
+    zstandard = None
+
+def nt_term(term):
+    """
+    Format an RDF term in N-Triples syntax.
+
+    Args:
+        term : URIRef, BNode or Literal.
+
+    Returns:
+        str: N-Triples representation of the term.
+    """
+    if isinstance(term, Literal):
+        value = str(term).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n").replace("\r", "\\r")
+        if term.language is not None:
+            return "\"" + value + "\"@" + term.language
+        if term.datatype is not None:
+            return "\"" + value + "\"^^<" + term.datatype + ">"
+        return "\"" + value + "\""
+    return term.n3()
+
+class LineSink(ABC):
+    """
+    Base of the sinks taking N-Triples (or N-Quads) lines.
+
+    add formats one triple, add_block takes lines already formatted by the
+    caller (e.g. by the vectorized mapping); subclasses implement write.
+    """
+
+    def __init__(self, path=None, context=None):
+        self.path = path
+        self.context = " " + nt_term(context) if context is not None else ""       # graph term for N-Quads
+        self.triples = 0
+
+    @abstractmethod
+    def write(self, text):
+        pass
+
+    def add(self, triple):
+        s, p, o = triple
+        self.write(nt_term(s) + " " + nt_term(p) + " " + nt_term(o) + self.context + " .\n")
+        self.triples += 1
+
+    def add_block(self, text, count):
+        self.write(text)
+        self.triples += count
+
+    def __len__(self):
+        return self.triples
+
+    def close(self):
+        pass
+
+class NTriplesSink(LineSink):
+    """Write triples to an N-Triples (or N-Quads) file as soon as they are added."""
+
+    def __init__(self, path=None, context=None, buffer_size=1 << 20):
+        super().__init__(path, context)
+        if path is not None:
+            self.file = open(path, "w", encoding="utf-8", buffering=buffer_size)
+        else:
+            self.file = io.StringIO()       # in memory, e.g. in a worker process
+
+    def write(self, text):
+        self.file.write(text)
+
+    def getvalue(self):
+        return self.file.getvalue()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+class PipelinedSink(LineSink):
+    """Write triples to an N-Triples (or N-Quads) file from a writer thread, fed through a bounded queue."""
+
+    def __init__(self, path, context=None, buffer_size=1 << 20, queue_size=4):
+        super().__init__(path, context)
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.size = 0
+        self.queue = queue.Queue(maxsize=queue_size)        # bounded, the mapping waits for the disk
+        self.errors = []
+        self.thread = threading.Thread(target=self.write_file, daemon=True)
+        self.thread.start()
+        self.closed = False
+
+    def write_file(self):
+        try:
+            with open(self.path, "w", encoding="utf-8") as file:
+                while True:
+                    text = self.queue.get()
+                    if text is None:
+                        break
+                    file.write(text)
+        except Exception as error:
+            self.errors.append(error)
+            while self.queue.get() is not None:        # drain, so that the producer never blocks
+                pass
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.queue.put("".join(self.buffer))
+            self.buffer = []
+            self.size = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        if self.errors:
+            raise self.errors[0]
+
+class PartitionedSink(LineSink):
+    """
+    Write triples to N part files, optionally compressed, each one written by its own thread.
+
+    Triples are partitioned by subject; the triples with a blank node go to the
+    first part, so that every blank node stays within one file.
+    """
+
+    def __init__(self, directory, parts=4, compression=None, extension="nt", context=None, buffer_size=1 << 20):
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError("Unknown compression: " + str(compression))
+        super().__init__(directory, context)
+        self.parts = parts
+        self.compression = compression
+        self.extension = extension
+        self.buffer_size = buffer_size
+        os.makedirs(directory, exist_ok=True)
+        suffix = {None: "", "gzip": ".gz", "zstd": ".zst"}[compression]
+        self.names = ["part-" + str(part).zfill(5) + "." + extension + suffix for part in range(0, parts)]
+        self.buffers = [[] for _ in range(0, parts)]
+        self.sizes = [0] * parts
+        self.counts = [0] * parts
+        self.queues = [queue.Queue(maxsize=4) for _ in range(0, parts)]        # bounded, the writers keep up
+        self.errors = []
+        self.threads = [threading.Thread(target=self.write_part, args=(part,), daemon=True) for part in range(0, parts)]
+        for thread in self.threads:
+            thread.start()
+        self.closed = False
+
+    def open_part(self, part):
+        path = os.path.join(self.path, self.names[part])
+        if self.compression == "gzip":
+            return gzip.open(path, "wb", compresslevel=6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+        return open(path, "wb")
+
+    def write_part(self, part):
+        try:
+            with self.open_part(part) as file:
+                while True:
+                    text = self.queues[part].get()
+                    if text is None:
+                        break
+                    file.write(text.encode("utf-8"))        # compression releases the GIL
+        except Exception as error:
+            self.errors.append(error)
+            while self.queues[part].get() is not None:        # drain, so that the producer never blocks
+                pass
+
+    def get_part(self, line):
+        subject, _, rest = line.split(" ", 2)
+        if subject.startswith("_:") or rest.startswith("_:"):
+            return 0
+        return zlib.crc32(subject.encode("utf-8")) % self.parts
+
+    def append(self, part, line):
+        self.buffers[part].append(line)
+        self.sizes[part] += len(line)
+        self.counts[part] += 1
+        if self.sizes[part] >= self.buffer_size:
+            self.flush(part)
+
+    def flush(self, part):
+        if self.buffers[part]:
+            self.queues[part].put("".join(self.buffers[part]))
+            self.buffers[part] = []
+            self.sizes[part] = 0
+
+    def write(self, text):
+        for line in text.split("\n")[:-1]:        # literals have their line breaks escaped
+            self.append(self.get_part(line), line + "\n")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for part in range(0, self.parts):
+            self.flush(part)
+            self.queues[part].put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+        manifest = {
+            "format": self.extension,
+            "compression": self.compression,
+            "triples": self.triples,
+            "parts": [{"file": self.names[part], "triples": self.counts[part], "bytes": os.path.getsize(os.path.join(self.path, self.names[part]))} for part in range(0, self.parts)],
+        }
+        with open(os.path.join(self.path, "manifest.json"), "w") as file:
+            json.dump(manifest, file, indent=2)
+
+class SQLiteStore(LineSink):
+    """
+    Write triples to a SQLite file, with integer-encoded terms and duplicates removed by the primary key.
+
+    Triples are committed in batches, so a crashed run can be inspected, and
+    running again into the same store only adds the missing triples (blank
+    nodes are new on every run).
+    """
+
+    def __init__(self, path, batch_size=100000, cache_size=1000000, record_run=True):
+        super().__init__(path)
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS triples (s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL, PRIMARY KEY (s, p, o)) WITHOUT ROWID")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, started REAL, finished REAL, triples INTEGER)")
+        self.run = self.connection.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid if record_run else None
+        self.connection.commit()
+        self.next_id = (self.connection.execute("SELECT MAX(id) FROM terms").fetchone()[0] or 0) + 1
+        self.lookup = self.next_id > 1          # terms may already be in the table
+        self.ids = {}           # cache of term ids
+        self.new_terms = []
+        self.batch = []
+        self.closed = False
+
+    def get_id(self, term):
+        term_id = self.ids.get(term)
+        if term_id is None:
+            row = self.connection.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone() if self.lookup else None
+            if row is not None:
+                term_id = row[0]
+            else:
+                term_id = self.next_id
+                self.next_id += 1
+                self.new_terms.append((term_id, term))
+            if len(self.ids) >= self.cache_size:
+                self.flush()        # the new terms must be found in the table
+                self.ids = {}
+                self.lookup = True
+            self.ids[term] = term_id
+        return term_id
+
+    def add_line(self, s, p, o):
+        self.batch.append((self.get_id(s), self.get_id(p), self.get_id(o)))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def add(self, triple):
+        s, p, o = triple
+        self.add_line(nt_term(s), nt_term(p), nt_term(o))        # no line to split
+        self.triples += 1
+
+    def write(self, text):
+        for line in text.split("\n")[:-1]:
+            s, p, o = line[:-2].split(" ", 2)        # without the final " ."
+            self.add_line(s, p, o)
+
+    def flush(self):
+        if self.new_terms:
+            self.connection.executemany("INSERT INTO terms (id, term) VALUES (?, ?)", self.new_terms)
+            self.new_terms = []
+        if self.batch:
+            self.connection.executemany("INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)", self.batch)
+            self.batch = []
+        self.connection.commit()
+
+    def count(self):
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM triples").fetchone()[0]
+
+    def lines(self):
+        self.flush()
+        query = "SELECT ts.term, tp.term, tobj.term FROM triples JOIN terms ts ON ts.id = triples.s JOIN terms tp ON tp.id = triples.p JOIN terms tobj ON tobj.id = triples.o"
+        for s, p, o in self.connection.execute(query):
+            yield s + " " + p + " " + o + " .\n"
+
+    def export(self, path, output_format="nt", batch_size=100000):
+        """Export the distinct triples to an N-Triples file, or to any rdflib format through an in-memory graph."""
+        if output_format in ("nt", "nq"):
+            with open(path, "w", encoding="utf-8") as file:
+                for line in self.lines():
+                    file.write(line)
+            return None
+        from rdflib import Graph
+        g = Graph()
+        batch = []
+        for line in self.lines():
+            batch.append(line)
+            if len(batch) >= batch_size:
+                g.parse(data="".join(batch), format="nt")
+                batch = []
+        g.parse(data="".join(batch), format="nt")
+        g.serialize(path, output_format)
+        return g
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        if self.run is not None:
+            self.connection.execute("UPDATE runs SET finished = ?, triples = ? WHERE id = ?", (time.time(), self.triples, self.run))
+            self.connection.commit()
+        self.connection.close()
+
+class TripleList:
+    """Collect triples in a list, e.g. to send them back from a worker process."""
+
+    def __init__(self):
+        self.triples = []
+
+    def add(self, triple):
+        self.triples.append(triple)
+
+    def __len__(self):
+        return len(self.triples)
+
+    def close(self):
+        pass
+
+class RowRecorder(LineSink):
+    """Collect the N-Triples lines added for the current row, for incremental runs."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def write(self, text):
+        self.lines.append(text)
+
+    def take(self):
+        lines = self.lines
+        self.lines = []
+        return lines
+
+class CountingSink:
+    """Forward triples to a graph or sink, counting them, e.g. to profile the mappings."""
+
+    def __init__(self, g):
+        self.g = g
+        self.triples = 0
+
+    def add(self, triple):
+        self.g.add(triple)
+        self.triples += 1
+
+    def __len__(self):
+        return self.triples
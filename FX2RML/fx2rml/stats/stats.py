@@ -0,0 +1,92 @@
+import json
+import time
+
+class Stats:
+    """Wall and CPU time of the phases of a run, with counters of the mapped items."""
+
+    def __init__(self):
+        self.phases = {}        # name -> [wall, cpu, calls]
+        self.counters = {}
+
+    def start(self):
+        return (time.perf_counter(), time.process_time())
+
+    def stop(self, name, started):
+        phase = self.phases.setdefault(name, [0.0, 0.0, 0])
+        phase[0] += time.perf_counter() - started[0]
+        phase[1] += time.process_time() - started[1]
+        phase[2] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, iterable, name):
+        """Iterate, adding the time spent producing every item to a phase."""
+        iterator = iter(iterable)
+        while True:
+            started = self.start()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stop(name, started)
+                return
+            self.stop(name, started)
+            yield item
+
+    def to_dict(self):
+        return {
+            "phases": {name: {"wall": wall, "cpu": cpu, "calls": calls} for name, (wall, cpu, calls) in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def summary(self):
+        lines = [f"{'phase':<20} {'wall (s)':>10} {'cpu (s)':>10} {'calls':>10}"]
+        for name, (wall, cpu, calls) in self.phases.items():
+            lines.append(f"{name:<20} {wall:>10.3f} {cpu:>10.3f} {calls:>10}")
+        lines.append("")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<20} {value:>10}")
+        return "\n".join(lines)
+
+    def write(self, path):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+
+class Profile:
+    """Time and triples attributed to every element of the mappings (instances, lists, references, relations)."""
+
+    def __init__(self):
+        self.elements = {}      # (kind, name) -> [instantiate, emit, triples, calls]
+
+    def start(self):
+        return time.perf_counter()
+
+    def record(self, kind, name, started, instantiated, triples):
+        element = self.elements.setdefault((kind, name), [0.0, 0.0, 0, 0])
+        element[0] += instantiated - started
+        element[1] += time.perf_counter() - instantiated
+        element[2] += triples
+        element[3] += 1
+
+    def add_triples(self, kind, name, seconds, triples):
+        element = self.elements.setdefault((kind, name), [0.0, 0.0, 0, 0])
+        element[1] += seconds
+        element[2] += triples
+
+    def get_ranking(self):
+        return sorted(self.elements.items(), key=lambda item: item[1][0] + item[1][1], reverse=True)
+
+    def to_dict(self):
+        return [{"kind": kind, "name": name, "instantiate": instantiate, "emit": emit, "total": instantiate + emit, "triples": triples, "calls": calls} for (kind, name), (instantiate, emit, triples, calls) in self.get_ranking()]
+
+    def report(self, top=10):
+        total = sum(instantiate + emit for instantiate, emit, _, _ in self.elements.values()) or 1.0
+        lines = [f"{'element':<50} {'total (s)':>10} {'share':>7} {'inst. (s)':>10} {'emit (s)':>10} {'triples':>10}"]
+        for (kind, name), (instantiate, emit, triples, calls) in self.get_ranking()[:top]:
+            lines.append(f"{(kind + ' ' + name)[:50]:<50} {instantiate + emit:>10.3f} {(instantiate + emit) / total:>7.1%} {instantiate:>10.3f} {emit:>10.3f} {triples:>10}")
+        return "\n".join(lines)
+
+    def write(self, path):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
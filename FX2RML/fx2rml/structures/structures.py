@@ -1,14 +1,63 @@
 import hashlib
 
+def get_values_key(properties):
+    """
+    Get a fixed-width key for a set of instantiated property values, within the IRIs of one mapping.
+
+    Args:
+        properties : Iterable of (property, value) pairs.
+
+    Returns:
+        int: 128-bit key, stable across processes and runs.
+    """
+    text = "\x1e".join(property + "\x1f" + value for property, value in properties)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest(), "little")
+
+class ValueTemplate:
+    __slots__ = ("column", "suffix", "subfield", "datatype", "index")
+
+    def __init__(self, column, suffix="", subfield=None):
+        self.column = column
+        self.suffix = suffix
+        self.subfield = subfield
+        self.datatype = suffix.split("^^")[1] if "^^" in suffix else None
+        self.index = None        # position of the column in the column layout of the mapping, set once compiled
+
+    def __str__(self):
+        return f"ValueTemplate(column={self.column}, subfield={self.subfield}, suffix={self.suffix})"
+
+class Condition:
+    __slots__ = ("template", "operator", "literal", "label", "number")
+
+    def __init__(self, template, operator, literal, label, number=None):
+        self.template = template
+        self.operator = operator
+        self.literal = literal
+        self.label = label
+        self.number = number        # numeric literal of ordering comparisons
+
+    def __str__(self):
+        return f"Condition(template={self.template}, operator={self.operator}, literal={self.literal}, label={self.label})"
+
 class InstanceMapping:
+    __slots__ = ("name", "IRI", "conditions", "datatype_properties", "IRI_template", "templates", "compiled_conditions")
+
     def __init__(self, name, IRI=None):
         self.name = name
         self.IRI = IRI
         self.conditions = []
         self.datatype_properties = {}
+        self.IRI_template = None
+        self.templates = {}
+        self.compiled_conditions = []
 
     def set_conditions(self, conditions):
         self.conditions = conditions
+
+    def set_templates(self, IRI_template, templates, compiled_conditions):
+        self.IRI_template = IRI_template
+        self.templates = templates
+        self.compiled_conditions = compiled_conditions
     
     def add_datatype_property(self, property, column):
         self.datatype_properties[property] = column
@@ -18,11 +67,10 @@ class InstanceMapping:
 
     def __str__(self):
         return f"InstanceMapping(name={self.name}, datatype_properties={self.datatype_properties})"
-    
-    def get_key(self):
-        return hashlib.md5(str(self).encode()).hexdigest()
 
 class ListMapping:
+    __slots__ = ("name", "IRI", "is_collection", "conditions", "datatype_properties", "instance_mappings", "list_template", "IRI_template", "templates", "compiled_conditions", "collectionIRI")
+
     def __init__(self, name, IRI=None, is_collection=False):
         self.name = name
         self.IRI = IRI
@@ -30,6 +78,10 @@ class ListMapping:
         self.conditions = []
         self.datatype_properties = {}
         self.instance_mappings = []
+        self.list_template = None
+        self.IRI_template = None
+        self.templates = {}
+        self.compiled_conditions = []
 
     def set_IRI(self, IRI):
         self.IRI = IRI
@@ -43,6 +95,12 @@ class ListMapping:
     def add_instance_mapping(self, instance_mapping):
         self.instance_mappings.append(instance_mapping)
 
+    def set_templates(self, list_template, IRI_template, templates, compiled_conditions):
+        self.list_template = list_template
+        self.IRI_template = IRI_template
+        self.templates = templates
+        self.compiled_conditions = compiled_conditions
+
     def get_instance_mappings(self):
         return self.instance_mappings
 
@@ -52,11 +110,15 @@ class ListMapping:
             instance_mapping.set_conditions(conditions)
 
 class ReferenceMapping:
+    __slots__ = ("predicate", "subject", "column", "target_value", "target_template", "target_key")
+
     def __init__(self, predicate):
         self.predicate = predicate
         self.subject = None
         self.column = None
         self.target_value = None
+        self.target_template = None
+        self.target_key = None
 
     def set_subject(self, subject):
         self.subject = subject
@@ -67,11 +129,18 @@ class ReferenceMapping:
     def set_target_value(self, target_value):
         self.target_value = target_value
 
+    def set_templates(self, target_template, target_key):
+        self.target_template = target_template
+        self.target_key = target_key
+
 class RelationMapping:
+    __slots__ = ("name", "predicate", "conditions", "compiled_conditions", "subject", "object")
+
     def __init__(self, name):
         self.name = name
         self.predicate = name
         self.conditions = []
+        self.compiled_conditions = []
 
     def set_subject(self, subject):
         self.subject = subject
@@ -83,4 +152,90 @@ class RelationMapping:
        self.predicate = predicate
     
     def set_conditions(self, conditions):
-        self.conditions = conditions
\ No newline at end of file
+        self.conditions = conditions
+
+    def set_compiled_conditions(self, compiled_conditions):
+        self.compiled_conditions = compiled_conditions
+
+class InstanceBinding:
+    __slots__ = ("mapping", "name", "IRI", "datatype_properties", "label", "key")
+
+    def __init__(self, mapping, name, IRI, datatype_properties, label):
+        self.mapping = mapping        # shared compiled mapping
+        self.name = name
+        self.IRI = IRI
+        self.datatype_properties = datatype_properties
+        self.label = label
+        self.key = None
+
+    def __str__(self):
+        return f"InstanceBinding(name={self.name}, datatype_properties={self.datatype_properties})"
+
+    def get_key(self):
+        if self.key is None:        # computed once per instance
+            self.key = get_values_key(self.datatype_properties.items())
+        return self.key
+
+class ListBinding:
+    __slots__ = ("mapping", "name", "instance_mappings")
+
+    def __init__(self, mapping):
+        self.mapping = mapping        # shared compiled mapping
+        self.name = mapping.name + "_"
+        self.instance_mappings = []
+
+    @property
+    def IRI(self):
+        return self.mapping.IRI
+
+    @property
+    def is_collection(self):
+        return self.mapping.is_collection
+
+    def add_instance_mapping(self, instance_mapping):
+        self.instance_mappings.append(instance_mapping)
+
+    def get_instance_mappings(self):
+        return self.instance_mappings
+
+class ReferenceBinding:
+    __slots__ = ("mapping", "target_value")
+
+    def __init__(self, mapping, target_value):
+        self.mapping = mapping        # shared compiled mapping
+        self.target_value = target_value
+
+    @property
+    def predicate(self):
+        return self.mapping.predicate
+
+    @property
+    def subject(self):
+        return self.mapping.subject
+
+    @property
+    def column(self):
+        return self.mapping.target_key
+
+class RelationBinding:
+    __slots__ = ("mapping", "label")
+
+    def __init__(self, mapping, label):
+        self.mapping = mapping        # shared compiled mapping
+        self.label = label
+
+    @property
+    def name(self):
+        return self.mapping.name
+
+    @property
+    def predicate(self):
+        return self.mapping.predicate
+
+    @property
+    def subject(self):
+        return self.mapping.subject
+
+    @property
+    def object(self):
+        return self.mapping.object
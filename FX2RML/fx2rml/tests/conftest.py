@@ -0,0 +1,42 @@
+import csv
+import json
+import os
+import sys
+import pytest
+from rdflib import Graph
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))        # the modules import each other from the fx2rml directory
+from core import fx2rml
+
+PFAS_COLUMNS = ["name", "country", "source_text", "source_url", "pfas_sum", "details", "date", "year", "category", "lat", "lon", "city", "type", "sector", "source_type", "data_collection_method", "dataset_id", "dataset_name", "pfas_values", "matrix"]
+CATEGORIES = ["Known PFAS user", "Presumptive", "Sampling", ""]
+MATRICES = ["Surface water", "Groundwater", "Soil", ""]
+
+PFAS_MAPPINGS = ["PFAS/pfas.fxrml", "PFAS/matrix.fxrml"]
+
+def relative(path):
+    """Path relative to the tests directory, which fx2rml is given as here; path is absolute or already relative to it."""
+    return os.path.relpath(os.path.join(here, str(path)), here)
+
+def parse(path, output_format="nt"):
+    g = Graph()
+    g.parse(str(path), format=output_format)
+    return g
+
+def run(output_file, mapping_files, tabular_files, output_format="nt", **options):
+    """Map the files with fx2rml and parse its output."""
+    fx2rml(here, [relative(path) for path in mapping_files], [relative(path) for path in tabular_files], relative(output_file), output_format, **options)
+    return parse(output_file, output_format)
+
+@pytest.fixture
+def pfas_csv(tmp_path):
+    """PFAS rows with repeated names, places and substances (the PFAS data is not shipped with the tests)."""
+    path = tmp_path / "pfas.csv"
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(PFAS_COLUMNS)
+        for i in range(0, 120):
+            values = [{"cas_id": "http://cas/" + str((i + j) % 11), "substance": "S" + str((i * j) % 5), "unit": "ng/L", "less_than": [0.5, 2.0, 1, 10][(i + j) % 4]} for j in range(0, i % 3)]
+            writer.writerow(["N" + str(i % 17), ["FR", "DE", ""][i % 3], "t", "u", str(i / 10), "d", "2020-01-01", str(2000 + i % 5), CATEGORIES[i % 4], str(i % 13), "1.5", "C" + str(i % 9), "ty", "se", "st", "m" + str(i % 2), str(i % 4), "ds", json.dumps(values), MATRICES[i % 4]])
+    return str(path)
@@ -0,0 +1,30 @@
+import os
+import shutil
+import parsing.parser as parser
+from conftest import here
+
+def test_mapping_cache(tmp_path, monkeypatch):
+    mapping_file = tmp_path / "matrix.fxrml"
+    shutil.copy(os.path.join(here, "PFAS", "matrix.fxrml"), mapping_file)
+    cache_dir = str(tmp_path / "cache")
+    parsed = []
+    get_mapping = parser.get_mapping
+    monkeypatch.setattr(parser, "get_mapping", lambda *args: parsed.append(args[0]) or get_mapping(*args))
+    monkeypatch.setattr(parser, "mappings_memo", {})
+    def load():
+        parser.mappings_memo.clear()        # as in a new run
+        return parser.load_mapping(str(mapping_file), cache_dir=cache_dir)
+
+    mapping = load()
+    assert len(parsed) == 1 and len(os.listdir(cache_dir)) == 1
+    cached = load()        # read back from disk
+    assert len(parsed) == 1 and [m.name for m in cached[2]] == [m.name for m in mapping[2]]
+    assert cached[2][0].templates.keys() == mapping[2][0].templates.keys()
+
+    mapping_file.write_text(mapping_file.read_text().replace("p/description", "p/label"))        # new content
+    assert "http://p/label" in load()[2][0].datatype_properties
+    assert len(parsed) == 2 and len(os.listdir(cache_dir)) == 2
+
+    monkeypatch.setattr(parser, "CACHE_VERSION", parser.CACHE_VERSION + "-next")        # structures changed
+    load()
+    assert len(parsed) == 3 and len(os.listdir(cache_dir)) == 3
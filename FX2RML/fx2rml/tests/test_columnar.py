@@ -0,0 +1,33 @@
+import json
+import pandas as pd
+import pytest
+from rdflib.compare import isomorphic
+from conftest import PFAS_MAPPINGS, run
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.feather
+import pyarrow.parquet
+
+def run_pfas(output_file, tabular_file, chunk_size=None):
+    return run(output_file, PFAS_MAPPINGS, [tabular_file, "PFAS/matrix.csv"], chunk_size=chunk_size)
+
+def test_parquet_round_trip(tmp_path, pfas_csv):
+    parquet_file = str(tmp_path / "pfas.parquet")
+    pd.read_csv(pfas_csv, dtype=str, keep_default_na=False).to_parquet(parquet_file)
+    expected = run_pfas(tmp_path / "csv.nt", pfas_csv)
+    assert isomorphic(run_pfas(tmp_path / "parquet.nt", parquet_file), expected)
+    assert isomorphic(run_pfas(tmp_path / "parquet_chunks.nt", parquet_file, chunk_size=7), expected)        # decoded one batch at a time
+
+def test_parquet_typed_lists(tmp_path, pfas_csv):
+    data_frame = pd.read_csv(pfas_csv, dtype=str, keep_default_na=False)
+    table = pyarrow.Table.from_pandas(data_frame.drop(columns=["pfas_values"]), preserve_index=False)
+    values = [[dict(value, less_than=str(value["less_than"])) for value in json.loads(cell)] for cell in data_frame["pfas_values"]]        # Arrow would make 1 and 2.0 both doubles
+    table = table.append_column("pfas_values", pyarrow.array(values))        # list of structs instead of JSON text
+    parquet_file = str(tmp_path / "typed.parquet")
+    pyarrow.parquet.write_table(table, parquet_file)
+    arrow_file = str(tmp_path / "typed.arrow")
+    pyarrow.feather.write_feather(table, arrow_file)
+    expected = run_pfas(tmp_path / "csv.nt", pfas_csv)
+    assert isomorphic(run_pfas(tmp_path / "typed.nt", parquet_file), expected)
+    assert isomorphic(run_pfas(tmp_path / "typed_chunks.nt", parquet_file, chunk_size=7), expected)
+    assert isomorphic(run_pfas(tmp_path / "typed_arrow.nt", arrow_file, chunk_size=7), expected)
@@ -0,0 +1,37 @@
+from rdflib import RDF, URIRef
+from rdflib.compare import isomorphic
+from utils.utils import condition_holds
+from conftest import run
+
+MAPPING = """prefixes
+	c = this
+	p = http://p
+
+instances
+	row
+		p/id = $["id"]
+		class =
+			p/Big $["n"] >= "5"
+			p/Late $["s"] > "m"
+			p/Other
+"""
+
+def test_condition_holds():
+    assert condition_holds("10", ">", "2")        # numbers compare numerically
+    assert not condition_holds("10", "<", "2")
+    assert condition_holds("5.0", ">=", "5")
+    assert condition_holds("b", ">", "a")        # anything else compares as strings
+    assert condition_holds("10", "<", "1a")
+    assert condition_holds(None, "==", "None")
+    assert not condition_holds("x", "~", "x")        # unknown operator
+    assert condition_holds("x", "", "")        # default condition
+
+def test_labels(tmp_path):
+    mapping_file = tmp_path / "c.fxrml"
+    mapping_file.write_text(MAPPING)
+    csv_file = tmp_path / "c.csv"
+    csv_file.write_text("id,n,s\nr0,5,a\nr1,10,a\nr2,4,z\nr3,1,a\nr4,4,n\n")
+    g = run(tmp_path / "rows.nt", [mapping_file], [csv_file])
+    classes = {str(g.value(s, URIRef("http://p/id"))): g.value(s, RDF.type) for s in g.subjects(URIRef("http://p/id"), None)}
+    assert classes == {"r0": URIRef("http://p/Big"), "r1": URIRef("http://p/Big"), "r2": URIRef("http://p/Late"), "r3": URIRef("http://p/Other"), "r4": URIRef("http://p/Late")}
+    assert isomorphic(g, run(tmp_path / "columns.nt", [mapping_file], [csv_file], vectorized=True))
@@ -0,0 +1,21 @@
+import os
+import pandas as pd
+from rdflib import Graph, URIRef
+from rdflib.compare import isomorphic
+from engine.engine import Engine
+from conftest import here, PFAS_MAPPINGS, relative, run
+
+def test_batches(tmp_path, pfas_csv):
+    expected = run(tmp_path / "single.nt", PFAS_MAPPINGS, [relative(pfas_csv), "PFAS/matrix.csv"])
+    assert (None, URIRef("http://p/matrix"), None) in expected
+    engine = Engine.from_files([os.path.join(here, path) for path in PFAS_MAPPINGS])
+    pfas = pd.read_csv(pfas_csv, dtype=str)
+    for rows in (False, True):
+        g = Graph()
+        for start in range(0, len(pfas), 25):        # counters and reused IRIs carried across batches
+            batch = pfas.iloc[start:start + 25]
+            engine.map(batch.to_dict("records") if rows else batch, 0, g)
+        engine.map(pd.read_csv(os.path.join(here, "PFAS", "matrix.csv"), dtype=str), 1, g)
+        engine.finish(g)        # references across batches and mappings
+        assert isomorphic(g, expected)
+    engine.close()
@@ -0,0 +1,41 @@
+import sys
+import pandas as pd
+import pytest
+from rdflib.compare import isomorphic
+from core import main
+from incremental.incremental import fx2rml_incremental
+from conftest import here, PFAS_MAPPINGS, parse, relative, run
+
+def test_edited_row(tmp_path, pfas_csv):
+    inputs = [relative(pfas_csv), "PFAS/matrix.csv"]
+    manifest_file = relative(tmp_path / "manifest.sqlite")
+    output_file = relative(tmp_path / "incremental.nt")
+    fx2rml_incremental(here, PFAS_MAPPINGS, inputs, output_file, manifest_file, "nt")
+
+    data_frame = pd.read_csv(pfas_csv, dtype=str, keep_default_na=False)
+    data_frame.loc[2, "matrix"] = "Groundwater"        # only its reference changes
+    data_frame.to_csv(pfas_csv, index=False)
+    fx2rml_incremental(here, PFAS_MAPPINGS, inputs, output_file, manifest_file, "nt", delta=True)
+    assert isomorphic(parse(tmp_path / "incremental.nt"), run(tmp_path / "full.nt", PFAS_MAPPINGS, inputs))
+    with open(tmp_path / "incremental.added.nt") as file:        # and the collection of the row, with new blank nodes
+        assert [line for line in file if "_:" not in line] == ["<http://p/Sampling_0> <http://p/matrix> <http://p/matrix_1> .\n"]
+    with open(tmp_path / "incremental.removed.nt") as file:
+        assert [line for line in file if "_:" not in line] == ["<http://p/Sampling_0> <http://p/matrix> <http://p/matrix_7> .\n"]
+
+@pytest.mark.parametrize("option", [["--workers", "2"], ["--vectorized"], ["--parts", "2"], ["--store", "store.sqlite"], ["--pipeline"], ["--profile"]])
+def test_incompatible_options(monkeypatch, option):
+    monkeypatch.setattr(sys, "argv", ["core.py", "--mappings", PFAS_MAPPINGS[1], "--inputs", "PFAS/matrix.csv", "--output", "out.nt", "--incremental", "manifest.sqlite"] + option)
+    with pytest.raises(SystemExit):
+        main()
+
+def test_delta_requires_incremental(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["core.py", "--mappings", PFAS_MAPPINGS[1], "--inputs", "PFAS/matrix.csv", "--output", "out.nt", "--delta"])
+    with pytest.raises(SystemExit):
+        main()
+
+def test_not_a_manifest(tmp_path):
+    csv_file = tmp_path / "matrix.csv"
+    csv_file.write_text("Matrix,Description\nSoil,soil\n")
+    with pytest.raises(ValueError, match="is not an incremental manifest"):
+        fx2rml_incremental(here, PFAS_MAPPINGS[1:], ["PFAS/matrix.csv"], relative(tmp_path / "out.nt"), relative(csv_file), "nt")
+    assert csv_file.read_text() == "Matrix,Description\nSoil,soil\n"        # not replaced by a manifest
@@ -0,0 +1,21 @@
+from rdflib import URIRef
+from joins.joins import ReferenceJoin
+
+KEY = ("g", "matrix", "http://p/type")
+
+def fill(join):
+    key_id = join.register(KEY)
+    join.add_target(key_id, "Soil", URIRef("http://m/0"))
+    join.add_target(key_id, "Groundwater", URIRef("http://m/1"))
+    for i, value in enumerate(["Soil", "Nope", "Groundwater", "Soil"]):
+        join.add_reference(URIRef("http://r/" + str(i)), "http://p/matrix", KEY, value)
+    join.add_reference(URIRef("http://r/4"), "http://p/matrix", ("g", "other", "http://p/type"), "Soil")        # not a registered target
+    return join
+
+def test_counts_in_memory_and_spilled():
+    for memory_limit in (None, 1):
+        join = fill(ReferenceJoin(memory_limit=memory_limit))
+        triples = list(join.resolve())
+        join.close()
+        assert len(triples) == 3
+        assert (join.resolved, join.dropped) == (3, 2)
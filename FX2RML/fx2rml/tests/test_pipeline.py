@@ -0,0 +1,39 @@
+import sys
+import pytest
+from rdflib.compare import isomorphic
+from core import main
+from sinks.sinks import PipelinedSink
+from utils.utils import read_ahead
+from conftest import PFAS_MAPPINGS, relative, run
+
+def test_same_output(tmp_path, pfas_csv):
+    inputs = [relative(pfas_csv), "PFAS/matrix.csv"]
+    plain = run(tmp_path / "plain.nt", PFAS_MAPPINGS, inputs)
+    pipelined = run(tmp_path / "pipelined.nt", PFAS_MAPPINGS, inputs, chunk_size=25, pipeline=True)
+    assert isomorphic(plain, pipelined)
+    with open(tmp_path / "plain.nt") as plain_file, open(tmp_path / "pipelined.nt") as pipelined_file:
+        assert len(pipelined_file.readlines()) == len(plain_file.readlines())
+
+def test_read_ahead():
+    assert list(read_ahead(iter(range(0, 10)), 1)) == list(range(0, 10))
+    def failing():
+        yield 1
+        raise ValueError("bad chunk")
+    items = read_ahead(failing())
+    assert next(items) == 1
+    with pytest.raises(ValueError, match="bad chunk"):        # raised to the consumer
+        next(items)
+
+def test_writer_error(tmp_path):
+    g = PipelinedSink(str(tmp_path / "missing" / "out.nt"), buffer_size=1, queue_size=1)
+    for i in range(0, 10):        # the drained queue never blocks the producer
+        g.add_block("<http://e/" + str(i) + "> <http://p/p> \"v\" .\n", 1)
+    with pytest.raises(FileNotFoundError):
+        g.close()
+
+def test_pipeline_with_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["core.py", "--mappings", PFAS_MAPPINGS[1], "--inputs", "PFAS/matrix.csv", "--output", "out.nt", "--pipeline", "--workers", "2"])
+    with pytest.raises(SystemExit):
+        main()
+    with pytest.raises(ValueError, match="cannot be combined with worker processes"):
+        run(tmp_path / "out.nt", PFAS_MAPPINGS[1:], ["PFAS/matrix.csv"], pipeline=True, workers=2)
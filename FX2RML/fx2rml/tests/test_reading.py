@@ -0,0 +1,29 @@
+from rdflib import Literal, URIRef
+from core import read_data_frames
+from conftest import run
+
+MAPPING = """prefixes
+	r = this
+	p = http://p
+
+instances
+	row
+		p/id = $["id"]
+		p/x = $["x"]
+		class =
+			p/Row
+"""
+
+def test_referenced_columns_as_text(tmp_path):
+    csv_file = tmp_path / "r.csv"
+    csv_file.write_text("id,unused,x\nr0,a,0.10\nr1,b,1.50\nr2,c,3.0\nr3,d,007\nr4,e,\n")
+    data_frame = next(read_data_frames(str(csv_file), [], columns={"id", "x"}))
+    assert list(data_frame.columns) == ["id", "x"]        # only the referenced columns
+    assert list(data_frame["x"]) == ["0.10", "1.50", "3.0", "007", ""]        # as written, not parsed as floats
+
+    mapping_file = tmp_path / "r.fxrml"
+    mapping_file.write_text(MAPPING)
+    for vectorized in (False, True):
+        g = run(tmp_path / "r.nt", [mapping_file], [csv_file], vectorized=vectorized)
+        values = {str(g.value(s, URIRef("http://p/id"))): g.value(s, URIRef("http://p/x")) for s in g.subjects(URIRef("http://p/id"), None)}
+        assert values == {"r0": Literal("0.10"), "r1": Literal("1.50"), "r2": Literal("3"), "r3": Literal("007"), "r4": None}        # but a trailing .0 is still dropped
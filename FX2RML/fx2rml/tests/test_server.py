@@ -0,0 +1,38 @@
+import http.client
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from server.server import create_server, load_mappings
+from conftest import here, PFAS_MAPPINGS, relative, run
+
+def post(port, path, body):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("POST", path, body, {"Content-Length": str(len(body))})
+    response = connection.getresponse()
+    result = (response.status, response.read().decode("utf-8"))
+    connection.close()
+    return result
+
+def test_post(tmp_path, pfas_csv):
+    expected = run(tmp_path / "pfas.nt", PFAS_MAPPINGS[:1], [relative(pfas_csv)])
+    server = create_server(load_mappings([os.path.join(here, PFAS_MAPPINGS[0])]), port=0, chunk_size=25)        # several batches per request
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    try:
+        with open(pfas_csv, "rb") as file:
+            body = file.read()
+        with ThreadPoolExecutor(max_workers=4) as executor:        # concurrent requests share the compiled mapping
+            responses = list(executor.map(lambda _: post(port, "/pfas?format=nt", body), range(0, 4)))
+        for status, text in responses:
+            assert status == 200
+            g = Graph()
+            g.parse(data=text, format="nt")
+            assert isomorphic(g, expected)
+        assert post(port, "/pfas?format=csv", body)[0] == 400
+        assert post(port, "/unknown", body)[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,20 @@
+from rdflib.compare import isomorphic
+from conftest import PFAS_MAPPINGS, run
+
+EV = "Electric Vehicles/"
+
+def check_shards(tmp_path, mapping_files, tabular_files, chunk_size, vectorized=False):
+    sequential = run(tmp_path / "sequential.nt", mapping_files, tabular_files, vectorized=vectorized)
+    sharded = run(tmp_path / "sharded.nt", mapping_files, tabular_files, chunk_size=chunk_size, vectorized=vectorized, workers=3)
+    assert isomorphic(sequential, sharded)
+    with open(tmp_path / "sequential.nt") as sequential_file, open(tmp_path / "sharded.nt") as sharded_file:
+        assert len(sharded_file.readlines()) == len(sequential_file.readlines())        # no property added again by a later range
+
+def test_shards_electric_vehicles(tmp_path):
+    check_shards(tmp_path, [EV + "electric vehicles.fxrml"], [EV + "electric vehicles_1.csv"], 1500)
+
+def test_shards_electric_vehicles_vectorized(tmp_path):
+    check_shards(tmp_path, [EV + "electric vehicles.fxrml"], [EV + "electric vehicles_1.csv"], 1500, vectorized=True)
+
+def test_shards_pfas(tmp_path, pfas_csv):
+    check_shards(tmp_path, PFAS_MAPPINGS, [pfas_csv, "PFAS/matrix.csv"], 25)
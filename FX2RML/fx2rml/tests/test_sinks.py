@@ -0,0 +1,54 @@
+import gzip
+import os
+import sys
+import pytest
+from rdflib import Literal, RDF, URIRef
+from core import main
+from sinks.sinks import *
+
+TRIPLES = [(URIRef("http://e/" + str(i)), RDF.type, URIRef("http://c/" + str(i % 3))) for i in range(0, 20)] + [(URIRef("http://e/" + str(i)), URIRef("http://p/name"), Literal("n\n" + str(i))) for i in range(0, 20)]
+
+def fill(g):
+    block = NTriplesSink()
+    for triple in TRIPLES[10:]:
+        block.add(triple)
+    for triple in TRIPLES[:10]:
+        g.add(triple)
+    g.add_block(block.getvalue(), len(block))        # lines formatted by another sink, as from the vectorized mapping
+    g.close()
+    return g
+
+def expected():
+    g = NTriplesSink()
+    for triple in TRIPLES:
+        g.add(triple)
+    return sorted(g.getvalue().splitlines(keepends=True))
+
+def test_line_sinks(tmp_path):
+    for g in (NTriplesSink(str(tmp_path / "out.nt")), PipelinedSink(str(tmp_path / "pipelined.nt"))):
+        assert isinstance(fill(g), LineSink) and len(g) == len(TRIPLES)
+        with open(g.path) as file:
+            assert sorted(file.readlines()) == expected()
+
+def test_partitioned_sink(tmp_path):
+    g = fill(PartitionedSink(str(tmp_path / "parts"), 3, "gzip"))
+    lines = []
+    for name in g.names:
+        with gzip.open(os.path.join(g.path, name), "rt") as file:
+            lines += file.readlines()
+    assert len(g) == len(TRIPLES) and sorted(lines) == expected()
+
+def test_sqlite_store(tmp_path):
+    fill(SQLiteStore(str(tmp_path / "store.db")))
+    fill(SQLiteStore(str(tmp_path / "store.db")))        # the second run adds nothing new
+    store = SQLiteStore(str(tmp_path / "store.db"), record_run=False)
+    assert sorted(store.lines()) == expected() and store.count() == len(TRIPLES)
+    store.close()
+
+def test_export_missing_store(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)        # main reads the paths from the working directory
+    monkeypatch.setattr(sys, "argv", ["core.py", "--store", "missing.db", "--export-store", "--output", "out.nt"])
+    with pytest.raises(SystemExit):
+        main()
+    assert "does not exist" in capsys.readouterr().err
+    assert not os.path.exists(tmp_path / "missing.db")
@@ -0,0 +1,10 @@
+from utils.utils import parse_list
+
+def test_parse_list():
+    assert parse_list('[{"a": 1, "b": "x"}]') == [{"a": 1, "b": "x"}]        # JSON
+    assert parse_list("[{'a': 1, 'b': None}]") == [{"a": 1, "b": None}]        # Python literal, as written by pandas
+    assert parse_list('{"a": 1}') == {"a": 1}
+    assert parse_list("") == []
+    assert parse_list("not a list") == []
+    assert parse_list("[1,") == []
+    assert parse_list("[1]") is parse_list("[1]")        # memoized on the cell
@@ -0,0 +1,11 @@
+import numpy as np
+import pytest
+from vectorized import nt_IRIs, nt_labels
+
+def test_nt_IRIs():
+    assert list(nt_IRIs(np.array(["http://e/1", "http://e/2"], dtype=object))) == ["<http://e/1>", "<http://e/2>"]
+    with pytest.raises(Exception, match="does not look like a valid URI"):        # as nt_term in the row engine
+        nt_IRIs(np.array(["http://e/1", "http://e/a b"], dtype=object))
+
+def test_nt_labels():
+    assert list(nt_labels(np.array(["http://p/A", "http://p/B", "http://p/A"], dtype=object))) == ["<http://p/A>", "<http://p/B>", "<http://p/A>"]
@@ -1,3 +1,16 @@
+import ast
+import json
+import operator
+import queue
+import threading
+from functools import lru_cache
+from rdflib import URIRef, Literal
+try:
+    import orjson        # optional faster JSON parser
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 def get_full_name(value, prefix_mappings, separator="="):           # distinguish whether there is an abbreviation or not in FX2RML
     """
     Get the full name of a value by resolving its prefix.
@@ -23,43 +36,121 @@ def get_full_name(value, prefix_mappings, separator="="):           # distinguis
 
     return full_name
 
-def get_correct_label(mapping):
+def create_IRI(label, counters):
     """
-    Get the correct label for a mapping based on its conditions.
+    Create a new IRI for a class label from its counter.
 
     Args:
-        mapping : Mapping object containing conditions.
+        label : Class label.
+        counters : Dictionary of counters for IRIs.
 
     Returns:
-        str: Label determined by the first satisfied condition.
+        str: New IRI.
     """
-    correct_condition = False
-    i = 0
-    label = ""
-    while not correct_condition and i < len(mapping.conditions):            # find the satisfied condition to determine the class/predicate label
-        if mapping.conditions[i][1] == "==" and str(mapping.conditions[i][0]) == mapping.conditions[i][2]:          # == operator
-            correct_condition = True
-            label = mapping.conditions[i][3]
-        elif mapping.conditions[i][1] == "<" and str(mapping.conditions[i][0]) < mapping.conditions[i][2]:          # < operator
-            correct_condition = True
-            label = mapping.conditions[i][3]
-        elif mapping.conditions[i][1] == "<=" and str(mapping.conditions[i][0]) <= mapping.conditions[i][2]:        # <= operator
-            correct_condition = True
-            label = mapping.conditions[i][3]
-        elif mapping.conditions[i][1] == ">" and str(mapping.conditions[i][0]) > mapping.conditions[i][2]:          # > operator
-            correct_condition = True
-            label = mapping.conditions[i][3]
-        elif mapping.conditions[i][1] == ">=" and str(mapping.conditions[i][0]) >= mapping.conditions[i][2]:        # >= operator
-            correct_condition = True
-        elif mapping.conditions[i][1] == "!=" and str(mapping.conditions[i][0]) != mapping.conditions[i][2]:        # != operator
-            correct_condition = True
-            label = mapping.conditions[i][3]
-        elif mapping.conditions[i][1] == "":        # default condition
-            correct_condition = True              
-            label = mapping.conditions[i][3]
-        i += 1
-    
-    return label
+    if label not in counters:
+        counters[label] = 0
+    else:
+        counters[label] += 1
+    return label + "_" + str(counters[label])
+
+@lru_cache(maxsize=65536)
+def parse_list(value):
+    """
+    Parse the content of a list cell, memoized on the cell string.
+
+    JSON is tried first, as it is much faster than ast.literal_eval, which
+    still handles Python literals (e.g. single quotes).
+
+    Args:
+        value : String of the cell.
+
+    Returns:
+        object: Parsed list or empty list on failure.
+    """
+    if value == "":
+        return []
+    try:
+        parsed = json_loads(value)
+        if isinstance(parsed, (list, dict)):
+            return parsed
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+
+COMPARISONS = {"==": operator.eq, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "!=": operator.ne}
+ORDERINGS = ("<", "<=", ">", ">=")
+
+@lru_cache(maxsize=None)
+def get_IRI_term(value):
+    """
+    Get the IRI term of a constant of the mapping (property, class or predicate), built once.
+
+    Args:
+        value : IRI string.
+
+    Returns:
+        URIRef: Shared IRI term.
+    """
+    return URIRef(value)
+
+@lru_cache(maxsize=65536)
+def get_literal_term(value):
+    """
+    Get the literal term of a value, shared by the cells with the same value (e.g. low-cardinality columns).
+
+    Args:
+        value : Literal string.
+
+    Returns:
+        Literal: Shared literal term.
+    """
+    return Literal(value)
+
+def to_number(text):
+    """
+    Convert a condition value to a number.
+
+    Args:
+        text : String value.
+
+    Returns:
+        float: Number or None if the value is not a number.
+    """
+    try:
+        number = float(text)
+    except (ValueError, TypeError):
+        return None
+    return number if number == number else None        # NaN is not a number here
+
+def condition_holds(value, operator, literal, number=None):
+    """
+    Check a condition, comparing numbers numerically and anything else as strings.
+
+    Args:
+        value : Instantiated value of the condition.
+        operator : Comparison operator ("" for the default condition).
+        literal : Literal compared with the value.
+        number : Numeric literal, if already converted (default: None).
+
+    Returns:
+        bool: Whether the condition is satisfied.
+    """
+    if operator == "":        # default condition
+        return True
+    if operator not in COMPARISONS:
+        return False
+    text = str(value)
+    if operator in ORDERINGS:
+        if number is None:
+            number = to_number(literal)
+        if number is not None:
+            value_number = to_number(text)
+            if value_number is not None:
+                return COMPARISONS[operator](value_number, number)
+    return COMPARISONS[operator](text, literal)
 
 def print_graph(g):
     """
@@ -79,4 +170,53 @@ def print_graph(g):
         print("---")
         i += 1
         if i > 10:
-            break
\ No newline at end of file
+            break
+
+def read_ahead(items, size=2):
+    """
+    Produce the items of an iterator in a thread, ahead of the consumer.
+
+    At most size items wait in a bounded queue, so a fast producer cannot run
+    ahead of the consumer by more than that; errors are raised to the consumer.
+
+    Args:
+        items : Iterable, e.g. of data frames read from a file.
+        size : Maximum number of items waiting (default is 2).
+
+    Returns:
+        iterator: The same items, in order.
+    """
+    waiting = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    end = object()
+
+    def put(entry):
+        while not stop.is_set():        # give up if the consumer stopped early
+            try:
+                waiting.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((end, None))
+        except Exception as error:
+            put((end, error))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = waiting.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,295 @@
+from rdflib import RDF, URIRef
+from structures.structures import get_values_key
+from utils.utils import create_IRI, to_number, get_IRI_term, get_literal_term, COMPARISONS
+import numpy as np
+import pandas as pd
+import re
+from sinks.sinks import *
+
+INVALID_IRI = "[" + re.escape("<>\" {}|\\^`") + "]"        # characters rdflib refuses to serialize in an IRI
+
+def column_values(template, data_frame):
+    """
+    Instantiate a compiled template over a whole column.
+
+    Args:
+        template : Compiled value template.
+        data_frame : Cleaned data frame, in the column layout of the mapping.
+
+    Returns:
+        ndarray: Instantiated values, None where the cell is empty or the column is not found.
+    """
+    column = data_frame.iloc[:, template.index].astype(object)
+    decimal = column.str.endswith(".0").to_numpy(dtype=bool)
+    if decimal.any():
+        column[decimal] = column[decimal].str.split(".0", n=1, regex=False).str[0]        # same as instantiate_value
+    values = (column + template.suffix).to_numpy(dtype=object, copy=True)
+    values[(column == "").to_numpy()] = None
+    return values
+
+def condition_labels(compiled_conditions, data_frame):
+    """
+    Find the label of the first satisfied condition for every row.
+
+    Args:
+        compiled_conditions : List of compiled conditions.
+        data_frame : Cleaned data frame.
+
+    Returns:
+        ndarray: Label of every row ("" if no condition is satisfied).
+    """
+    labels = np.full(len(data_frame), "", dtype=object)
+    for condition in reversed(compiled_conditions):        # earlier conditions win
+        if condition.operator == "":        # default condition
+            labels[:] = condition.label
+            continue
+        if condition.operator not in COMPARISONS:
+            continue
+        if condition.template is not None:
+            values = column_values(condition.template, data_frame)
+            values[pd.isna(values)] = "None"        # str(None) as in condition_holds
+        else:
+            values = np.full(len(data_frame), "", dtype=object)
+        compare = COMPARISONS[condition.operator]
+        if condition.number is None:        # string comparison over the whole column
+            mask = np.asarray(compare(values, condition.literal), dtype=bool)
+        else:
+            codes, uniques = pd.factorize(values)        # convert each distinct value once
+            numbers = np.array([to_number(value) for value in uniques], dtype=float)        # NaN where not a number
+            is_number = ~np.isnan(numbers)
+            outcomes = np.asarray(compare(uniques.astype(object), condition.literal), dtype=bool)
+            outcomes[is_number] = compare(numbers[is_number], condition.number)
+            mask = outcomes[codes]
+        labels[mask] = condition.label
+    return labels
+
+def get_relation_members(key, mappings_index):
+    """
+    Get the instance mappings matched by the subject or object of a relation.
+
+    Args:
+        key : Subject or object of the relation.
+        mappings_index : Dictionary from instance mapping name to its position.
+
+    Returns:
+        list: Positions of the matching instance mappings.
+    """
+    return [mappings_index[key]] if key in mappings_index else []
+
+def map_columns(graph_name, g, data_frame, instances_mappings, references_mappings, relations_mappings, counters, mapped_iris, join, mint=create_IRI):
+    """
+    Map a data frame column-wise, for mappings without list mappings.
+
+    IRIs, literals and labels are computed over whole columns, then the triples
+    are added row by row in the same order as the row engine.
+
+    Args:
+        graph_name : Name of the graph.
+        g : RDF graph or triple sink.
+        data_frame : Cleaned data frame, bound to the compiled templates.
+        instances_mappings : List of instance mappings.
+        references_mappings : List of reference mappings.
+        relations_mappings : List of relation mappings.
+        counters : Dictionary of counters for IRIs.
+        mapped_iris : Dictionary of mapped IRIs, by mapping name and values key.
+        join : Reference join, collecting the target values and the references.
+        mint : Function creating new IRIs from a label and the counters (default: create_IRI).
+
+    Returns:
+        tuple: Updated graph, reference join, counters and mapped IRIs.
+    """
+    n = len(data_frame)
+    labels = []
+    IRIs = []
+    reused = []
+    typed = []
+    properties = []
+    events = []
+    minted = []
+    for m, instance_mapping in enumerate(instances_mappings):
+        labels.append(condition_labels(instance_mapping.compiled_conditions, data_frame))
+        if instance_mapping.IRI_template is not None:
+            IRI = column_values(instance_mapping.IRI_template, data_frame)
+        else:
+            IRI = np.full(n, None, dtype=object)
+        values = []
+        for property, template in instance_mapping.templates.items():
+            if template is not None:
+                values.append((property, column_values(template, data_frame)))
+            else:
+                values.append((property, np.full(n, instance_mapping.datatype_properties[property], dtype=object)))
+        properties.append([(get_IRI_term(property), value) for property, value in values])
+
+        rows = np.flatnonzero(pd.isna(IRI))        # rows with IRIs to create
+        keys = pd.Series(list(zip(*[value[rows] for _, value in values])) if values else [()] * len(rows), dtype=object)
+        codes, uniques = pd.factorize(keys)
+        first_rows = rows[np.unique(codes, return_index=True)[1]] if len(rows) > 0 else rows
+        dictionary = mapped_iris.setdefault(instance_mapping.name, {})
+        unique_IRIs = np.full(len(uniques), None, dtype=object)
+        emitted = np.full(len(uniques), None, dtype=object)        # class the IRI was last added with
+        is_new = np.zeros(len(uniques), dtype=bool)
+        unique_keys = []
+        for u in range(0, len(uniques)):
+            key = get_values_key((property, value) for (property, _), value in zip(values, uniques[u]) if value is not None)        # same key as InstanceBinding.get_key
+            unique_keys.append(key)
+            if key in dictionary:
+                unique_IRIs[u], emitted[u] = dictionary[key]     # fetch existing IRI
+            else:
+                is_new[u] = True
+                events.append((first_rows[u], m, u))
+        IRIs.append(IRI)
+        reused.append(np.zeros(n, dtype=bool))
+        typed.append(np.zeros(n, dtype=bool))
+        minted.append((rows, codes, unique_keys, unique_IRIs, emitted, is_new, first_rows))
+
+    for row, m, u in sorted(events):        # create new IRIs in row order, as the row engine does
+        rows, codes, unique_keys, unique_IRIs, emitted, is_new, first_rows = minted[m]
+        unique_IRIs[u] = mint(labels[m][row], counters)
+
+    for m in range(0, len(instances_mappings)):
+        rows, codes, unique_keys, unique_IRIs, emitted, is_new, first_rows = minted[m]
+        if len(rows) > 0:
+            IRIs[m][rows] = unique_IRIs[codes]
+            reused[m][rows] = True
+            reused[m][first_rows[is_new]] = False       # first occurrence of a new key
+            row_labels = pd.Series(labels[m][rows], dtype=object)
+            previous = np.array(row_labels.groupby(codes).shift(1), dtype=object)        # class of the previous row with the same IRI
+            first = pd.isna(previous)
+            previous[first] = emitted[codes[first]]
+            typed[m][rows] = row_labels.to_numpy(dtype=object) == previous        # class already added for this IRI
+            dictionary = mapped_iris[instances_mappings[m].name]
+            for u, label in row_labels.groupby(codes).last().items():
+                dictionary[unique_keys[u]] = (unique_IRIs[u], label)
+
+    # update target values
+    for m, instance_mapping in enumerate(instances_mappings):
+        targets = join.get_targets(graph_name, instance_mapping.name)
+        for property, value in properties[m]:
+            key_id = targets.get(str(property))
+            if key_id is not None:
+                for i in range(0, n):
+                    if value[i] is not None:
+                        property_value = value[i].split("^^")[0] if "^^" in value[i] else value[i]
+                        join.add_target(key_id, property_value, IRIs[m][i])
+
+    mappings_index = {}
+    for m, instance_mapping in enumerate(instances_mappings):
+        mappings_index[instance_mapping.name] = m       # later mappings with the same name win, as in mapped_instances
+
+    references = []
+    for reference_mapping in references_mappings:
+        if reference_mapping.target_template is not None:
+            references.append((mappings_index[reference_mapping.subject], reference_mapping.predicate, reference_mapping.target_key, column_values(reference_mapping.target_template, data_frame)))
+
+    relations = []
+    for relation_mapping in relations_mappings:
+        relations.append((get_relation_members(relation_mapping.subject, mappings_index), condition_labels(relation_mapping.compiled_conditions, data_frame), get_relation_members(relation_mapping.object, mappings_index)))
+
+    if isinstance(g, LineSink):
+        add_lines(g, IRIs, labels, reused, typed, properties, relations)       # format the triples column-wise
+    else:
+        for i in range(0, n):
+            individuals = []
+            for m in range(0, len(instances_mappings)):
+                individual = URIRef(IRIs[m][i])
+                if not typed[m][i]:
+                    g.add((individual, RDF.type, get_IRI_term(labels[m][i])))
+                if not reused[m][i]:
+                    for property, value in properties[m]:
+                        if value[i] is not None:
+                            g.add((individual, property, get_literal_term(value[i])))
+                individuals.append(individual)
+            for subjects, relation_labels, objects in relations:
+                for s in subjects:
+                    for o in objects:
+                        g.add((individuals[s], get_IRI_term(relation_labels[i]), individuals[o]))
+
+    # add references to the join
+    if len(references) > 0:
+        for i in range(0, n):
+            for m, predicate, key, target in references:
+                if target[i] is not None:
+                    join.add_reference(URIRef(IRIs[m][i]), predicate, key, target[i])
+
+    return g, join, counters, mapped_iris
+
+def nt_literals(values):
+    """
+    Format literal values in N-Triples syntax over a whole column.
+
+    Args:
+        values : Array of values, None where the cell is empty.
+
+    Returns:
+        ndarray: N-Triples literals ("" where the value is None).
+    """
+    column = pd.Series(values, dtype=object)
+    column = column.str.replace("\\", "\\\\", regex=False).str.replace("\"", "\\\"", regex=False).str.replace("\n", "\\n", regex=False).str.replace("\r", "\\r", regex=False)        # same escaping as nt_term
+    return ("\"" + column + "\"").fillna("").to_numpy(dtype=object)
+
+def nt_IRIs(IRIs):
+    """
+    Format IRIs in N-Triples syntax over a whole column, checked once per column.
+
+    Args:
+        IRIs : Array of IRIs.
+
+    Returns:
+        ndarray: N-Triples IRIs.
+    """
+    column = pd.Series(IRIs, dtype=object)
+    invalid = column.str.contains(INVALID_IRI).to_numpy(dtype=bool)
+    if invalid.any():
+        nt_term(URIRef(column[np.argmax(invalid)]))        # raises the same error as the row engine
+    return ("<" + column + ">").to_numpy(dtype=object)
+
+def nt_labels(labels):
+    """
+    Format the class or predicate labels of a column in N-Triples syntax, each distinct label once.
+
+    Args:
+        labels : Array of labels.
+
+    Returns:
+        ndarray: N-Triples IRIs of the labels.
+    """
+    codes, uniques = pd.factorize(labels)
+    return np.array([nt_term(get_IRI_term(label)) for label in uniques], dtype=object)[codes] if len(uniques) > 0 else np.full(len(labels), "", dtype=object)
+
+def add_lines(g, IRIs, labels, reused, typed, properties, relations):
+    """
+    Add the triples of a data frame to a line sink as one block of lines, in row order.
+
+    Args:
+        g : Line sink (N-Triples file, pipelined, partitioned or SQLite store).
+        IRIs : List of IRI arrays, one per instance mapping.
+        labels : List of class label arrays, one per instance mapping.
+        reused : List of arrays flagging reused IRIs, one per instance mapping.
+        typed : List of arrays flagging reused IRIs that already have their class, one per instance mapping.
+        properties : List of (property, values) lists, one per instance mapping.
+        relations : List of (subjects, labels, objects) relations.
+
+    Returns:
+        None
+    """
+    if len(IRIs) == 0:
+        return
+    end = g.context + " .\n"
+    type_predicate = " " + nt_term(RDF.type) + " "
+    subjects = [nt_IRIs(IRI) for IRI in IRIs]
+    lines = np.full(len(IRIs[0]), "", dtype=object)
+    count = 0
+    for m in range(0, len(IRIs)):
+        lines = lines + np.where(typed[m], "", subjects[m] + type_predicate + nt_labels(labels[m]) + end)
+        count += int((~typed[m]).sum())
+        for property, value in properties[m]:
+            present = pd.notna(value) & ~reused[m]
+            lines = lines + np.where(present, subjects[m] + " " + nt_term(property) + " " + nt_literals(value) + end, "")
+            count += int(present.sum())
+    for relation_subjects, relation_labels, relation_objects in relations:
+        predicates = " " + nt_labels(relation_labels) + " "
+        for s in relation_subjects:
+            for o in relation_objects:
+                lines = lines + subjects[s] + predicates + subjects[o] + end
+                count += len(lines)
+    g.add_block("".join(lines), count)
\ No newline at end of file